@@ -0,0 +1,77 @@
+'''
+Compares the sync and async query paths of the venue and artist pages under
+concurrent load. The database is seeded, then the app is served by a
+threaded development server once with ASYNC_DETAIL_PAGES off and once with
+it on, and p50/p99 latencies of /venues/<id> and /artists/<id> are printed
+for both. The response cache is disabled so every request hits the
+database, and each page is checked to be identical in both modes first.
+
+    python -m benchmarks.async_detail --database-url postgresql://localhost/fyyur_bench
+    python -m benchmarks.async_detail --database-url sqlite:////tmp/fyyur_bench.db
+
+The database must be empty; it is seeded and left in place.
+'''
+import argparse
+import logging
+import os
+import statistics
+import threading
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--venues', type=int, default=200)
+    parser.add_argument('--artists', type=int, default=200)
+    parser.add_argument('--shows', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15.0)
+    args = parser.parse_args()
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ['CACHE_BACKEND'] = 'null'
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+    from werkzeug.serving import make_server
+    from fyyur import create_app
+    from fyyur.extensions import db
+    from fyyur.models import Shows
+    from benchmarks.load import run_load, percentile
+    from benchmarks.seed import seed
+    app = create_app()
+    app.logger.setLevel(logging.ERROR)
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        if db.session.query(Shows.id).first() is not None:
+            parser.error('the database already has shows, use an empty one')
+        seed(args.venues, args.artists, args.shows)
+        db.session.commit()
+
+    paths = ['/{}/{}'.format(kind, i + 1) for i in range(min(args.venues, args.artists))
+             for kind in ('venues', 'artists')]
+    client = app.test_client()
+    for path in paths[:20]:
+        pages = []
+        for mode in (False, True):
+            app.config['ASYNC_DETAIL_PAGES'] = mode
+            pages.append(client.get(path).data)
+        if pages[0] != pages[1]:
+            raise SystemExit('sync and async output differ for {}'.format(path))
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = 'http://127.0.0.1:{}'.format(server.server_port)
+
+    print('{:8} {:>10} {:>8} {:>10} {:>10}'.format('mode', 'requests', 'errors', 'p50 ms', 'p99 ms'))
+    for mode in (False, True):
+        app.config['ASYNC_DETAIL_PAGES'] = mode
+        latencies, errors = run_load(base_url, paths, args.concurrency, args.duration)
+        print('{:8} {:>10} {:>8} {:>10.1f} {:>10.1f}'.format(
+            'async' if mode else 'sync', len(latencies), len(errors),
+            statistics.median(latencies), percentile(latencies, 0.99)))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+'''
+Compares the original `datetime` Jinja filter (strftime in the view, then
+dateutil parse and babel format in the template) with the current one over
+100k show tiles.
+
+    python -m benchmarks.datetime_filter
+'''
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+
+
+def legacy_format_datetime(value, format='medium'):
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shows', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=5000,
+                        help='Distinct start times; shows mostly start on the hour.')
+    args = parser.parse_args()
+
+    from fyyur.filters import format_datetime, cached_format_datetime
+
+    rng = random.Random(0)
+    now = datetime(2020, 8, 13, 20, 0)
+    slots = [now + timedelta(hours=rng.randrange(args.distinct)) for i in range(args.distinct)]
+    start_times = [rng.choice(slots) for i in range(args.shows)]
+    unique_times = [now + timedelta(seconds=i) for i in range(args.shows)]
+
+    def run(label, function, values):
+        started = time.perf_counter()
+        output = [function(value, 'full') for value in values]
+        print('{:<40} {:8.1f} ms'.format(label, (time.perf_counter() - started) * 1000))
+        return output
+
+    legacy = run('legacy (strftime + parse + babel)', legacy_format_datetime,
+                 [value.strftime("%m/%d/%Y, %H:%M:%S") for value in start_times])
+    cached_format_datetime.cache_clear()
+    current = run('datetime objects, repeated times', format_datetime, start_times)
+    cached_format_datetime.cache_clear()
+    run('datetime objects, all distinct', format_datetime, unique_times)
+    assert legacy == current, 'filters disagree'
+
+
+if __name__ == '__main__':
+    main()
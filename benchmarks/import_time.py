@@ -0,0 +1,56 @@
+'''
+Cold-start cost of building the application, from `python -X importtime`.
+Prints the total import time, the slowest top-level imports and whether any
+module that should load lazily was imported at startup. With --max-ms it
+exits non-zero when the total exceeds the budget, so it can gate CI.
+
+    python -m benchmarks.import_time --max-ms 800
+'''
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a request formats a date or handles a form.
+LAZY_MODULES = ('babel', 'dateutil', 'wtforms', 'flask_wtf')
+
+
+def import_times():
+    env = dict(os.environ, FYYUR_ENV='test')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from fyyur import create_app; create_app()'],
+        env=env, cwd=PROJECT_ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-ms', type=float)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times()
+    total_ms = sum(self_us for self_us, cumulative_us, name in rows) / 1000
+    top_level = [row for row in rows if not row[2].startswith('  ')]
+    print('total import time {:.1f} ms ({} modules)'.format(total_ms, len(rows)))
+    for self_us, cumulative_us, name in sorted(top_level, reverse=True, key=lambda row: row[1])[:args.top]:
+        print('{:10.1f} ms  {}'.format(cumulative_us / 1000, name.strip()))
+
+    loaded = sorted({name.strip().split('.')[0] for self_us, cumulative_us, name in rows} & set(LAZY_MODULES))
+    if loaded:
+        print('imported at startup but expected lazily: {}'.format(', '.join(loaded)))
+    if loaded or (args.max_ms is not None and total_ms > args.max_ms):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
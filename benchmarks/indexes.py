@@ -0,0 +1,92 @@
+'''
+Seeds a scratch database and reports query plans and latencies for the
+queries behind each view, with and without the Shows(venue_id, start_time)
+and Shows(artist_id, start_time) indexes.
+
+    python -m benchmarks.indexes --database-url postgresql://localhost/fyyur_bench
+
+The database must be empty; it is seeded and left in place.
+'''
+import argparse
+import os
+import statistics
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--venues', type=int, default=2000)
+    parser.add_argument('--artists', type=int, default=2000)
+    parser.add_argument('--shows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    os.environ['DATABASE_URL'] = args.database_url
+
+    from flask import g
+    from sqlalchemy import event
+    from fyyur import create_app
+    from fyyur.extensions import db
+    from fyyur.models import Venue, Artist, Shows
+    from fyyur.queries import venue_areas, load_detail, search_entities, show_listing
+    from benchmarks.seed import seed
+    app = create_app()
+
+    cases = {
+        'venues': lambda: list(venue_areas()),
+        'search_venues': lambda: search_entities(Venue, 'the'),
+        'search_artists': lambda: search_entities(Artist, 'the'),
+        'show_venue': lambda: load_detail(Venue, 1, 'Artist'),
+        'show_artist': lambda: load_detail(Artist, 1, 'Venue'),
+        'shows': lambda: show_listing(),
+    }
+    indexes = [index for index in Shows.__table__.indexes
+               if index.name in ('ix_Shows_venue_id_start_time', 'ix_Shows_artist_id_start_time')]
+
+    with app.app_context(), app.test_request_context():
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            db.session.commit()
+        db.create_all()
+        if db.session.query(Shows.id).first() is not None:
+            parser.error('the database already has shows, use an empty one')
+        seed(args.venues, args.artists, args.shows)
+        explain = 'EXPLAIN ANALYZE ' if db.engine.dialect.name == 'postgresql' else 'EXPLAIN QUERY PLAN '
+
+        statements = []
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', capture)
+
+        def run(label):
+            print('== {} =='.format(label))
+            for name, case in cases.items():
+                timings = []
+                for i in range(args.repeat):
+                    del statements[:]
+                    db.session.expunge_all()
+                    g.pop('entity_loader', None)
+                    started = time.perf_counter()
+                    case()
+                    timings.append((time.perf_counter() - started) * 1000)
+                print('{:<16} median {:8.2f} ms  max {:8.2f} ms  {} statements'.format(
+                    name, statistics.median(timings), max(timings), len(statements)))
+                plan_statements = list(statements)
+                event.remove(db.engine, 'before_cursor_execute', capture)
+                for statement, parameters in plan_statements:
+                    for line in db.session.connection().exec_driver_sql(explain + statement, parameters):
+                        print('    ' + ' '.join(str(column) for column in line))
+                event.listen(db.engine, 'before_cursor_execute', capture)
+
+        for index in indexes:
+            index.drop(db.session.connection())
+        db.session.commit()
+        run('without Shows foreign key indexes')
+        for index in indexes:
+            index.create(db.session.connection())
+        db.session.commit()
+        run('with Shows foreign key indexes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+'''
+Closed-loop HTTP load test against a running server: N concurrent clients
+request the given paths for a fixed duration and the throughput and latency
+percentiles are printed. Run it once against the development server and once
+against the production profile to compare them:
+
+    python app.py
+    python -m benchmarks.load http://localhost:5000
+
+    FYYUR_ENV=prod SECRET_KEY=x DATABASE_URL=... gunicorn --workers 4 --preload wsgi:app
+    python -m benchmarks.load http://localhost:8000
+'''
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+
+
+def run_load(base_url, paths, concurrency=16, duration=20.0):
+    # Returns the sorted latencies in ms of the successful requests and the
+    # errors raised by the others.
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            url = base_url.rstrip('/') + paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+            except Exception as error:
+                with lock:
+                    errors.append(error)
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return latencies, errors
+
+
+def percentile(latencies, fraction):
+    return latencies[max(int(len(latencies) * fraction) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('base_url')
+    parser.add_argument('--paths', default='/,/venues,/artists,/shows,/venues/1,/artists/1')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0)
+    args = parser.parse_args()
+
+    latencies, errors = run_load(args.base_url, args.paths.split(','), args.concurrency, args.duration)
+    if not latencies:
+        print('no successful requests, {} errors'.format(len(errors)))
+        return
+    print('requests     {}'.format(len(latencies)))
+    print('errors       {}'.format(len(errors)))
+    print('throughput   {:.1f} req/s'.format(len(latencies) / args.duration))
+    print('p50          {:.1f} ms'.format(statistics.median(latencies)))
+    print('p99          {:.1f} ms'.format(percentile(latencies, 0.99)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+'''
+Per-route benchmark. Every route of the app is requested through the Flask
+test client and its latency (p50/p99/mean), SQL statement count and peak
+Python memory are written to a JSON file, so two commits can be compared
+on the same data.
+
+    python -m benchmarks.routes --database-url sqlite:////tmp/fyyur_routes.db --output before.json
+    git checkout my-branch
+    python -m benchmarks.routes --database-url sqlite:////tmp/fyyur_routes.db --output after.json \
+        --compare before.json
+
+An empty database is first seeded with benchmarks.seed (--venues, --artists,
+--shows, --skew); a seeded one, e.g. by `python -m benchmarks.seed` with
+millions of shows, is used as it is. Write routes add rows, so compare runs
+on copies of the same seeded database. The response cache is off unless
+--cache-backend says otherwise.
+
+Latencies come from --repeat timed requests per route; peak memory from one
+further request under tracemalloc, which is too slow to time with. Routes of
+the app that no case covers are listed, and any 5xx response makes the run
+exit non-zero. --quick runs a small dataset and three requests per route,
+as a smoke test of every route.
+'''
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Case(object):
+    # One request to time. prepare(i) runs untimed before the i-th request
+    # and returns the keyword arguments of client.open().
+    def __init__(self, endpoint, label, prepare):
+        self.endpoint = endpoint
+        self.label = label
+        self.prepare = prepare
+
+
+def get(endpoint, path):
+    return Case(endpoint, 'GET ' + path, lambda i: {'path': path})
+
+
+def post(endpoint, label, make_data):
+    return Case(endpoint, 'POST ' + label, lambda i: dict(make_data(i), method='POST'))
+
+
+def venue_form(name):
+    return {
+        'name': name, 'city': 'Bench City', 'state': 'CA', 'address': '1 Bench St',
+        'phone': '555-0100', 'genres': ['Jazz', 'Blues'], 'facebook_link': 'https://www.facebook.com/bench',
+        'image_link': '',
+    }
+
+
+def artist_form(name):
+    return {
+        'name': name, 'city': 'Bench City', 'state': 'CA', 'phone': '555-0101',
+        'genres': ['Rock n Roll'], 'facebook_link': 'https://www.facebook.com/bench', 'image_link': '',
+    }
+
+
+def build_cases(app, run_id):
+    # Requests covering every route, against the first venue and artist, an
+    # area that has venues and a venue and artist created for the run, which
+    # have no shows of their own so new bookings never clash.
+    from fyyur.extensions import db
+    from fyyur.models import Venue, Artist
+
+    with app.app_context():
+        venue = db.session.query(Venue).order_by(Venue.id).first()
+        artist = db.session.query(Artist).order_by(Artist.id).first()
+        state, city, venue_id, artist_id = venue.state, venue.city, venue.id, artist.id
+        own_venue = Venue(**dict(venue_form('Bench venue {}'.format(run_id)), genres=['Jazz']))
+        own_artist = Artist(**dict(artist_form('Bench artist {}'.format(run_id)), genres=['Rock']))
+        db.session.add_all([own_venue, own_artist])
+        db.session.commit()
+        own_venue_id, own_artist_id = own_venue.id, own_artist.id
+
+    today = datetime.utcnow().date().isoformat()
+    area = 'state={}&city={}'.format(state, city.replace(' ', '+'))
+    booking_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=800)
+
+    def doomed_venue(i):
+        # A fresh venue for each DELETE, created outside the timed request.
+        with app.app_context():
+            doomed = Venue(**dict(venue_form('Doomed venue {} {}'.format(run_id, i)), genres=['Jazz']))
+            db.session.add(doomed)
+            db.session.commit()
+            return {'path': '/venues/{}'.format(doomed.id), 'method': 'DELETE'}
+
+    def doomed_artist(i):
+        with app.app_context():
+            doomed = Artist(**dict(artist_form('Doomed artist {} {}'.format(run_id, i)), genres=['Rock']))
+            db.session.add(doomed)
+            db.session.commit()
+            return {'path': '/artists/{}'.format(doomed.id), 'method': 'DELETE'}
+
+    def edit(model, entity_id, form):
+        # The edit form as submitted from the current version of the row.
+        def prepare(i):
+            with app.app_context():
+                version = db.session.get(model, entity_id).version
+                db.session.close()
+            path = '/{}s/{}/edit'.format(model.__name__.lower(), entity_id)
+            return {'path': path, 'data': dict(form('Bench {} {} {}'.format(model.__name__.lower(), run_id, i)),
+                                               version=version)}
+        return prepare
+
+    def import_file(i):
+        lines = ['name,city,state,address,phone,genres,facebook_link']
+        lines += ['Imported venue {} {} {},Bench City,CA,1 Bench St,555-0102,"Jazz,Folk",'
+                  'https://www.facebook.com/bench'.format(run_id, i, n) for n in range(20)]
+        return {'path': '/import/venues', 'method': 'POST',
+                'data': {'file': (io.BytesIO('\n'.join(lines).encode()), 'venues.csv')}}
+
+    def tour_form(i):
+        # Six dates for the run's artist at the run's venue, clear of the
+        # single bookings above.
+        data = {'kind': 'artist', 'fixed_id': own_artist_id, 'all_or_nothing': 'y'}
+        for n in range(6):
+            data['dates-{}-other_id'.format(n)] = own_venue_id
+            data['dates-{}-duration'.format(n)] = 60
+            data['dates-{}-start_time'.format(n)] = (
+                booking_start + timedelta(days=100, hours=2 * (6 * i + n))).strftime('%Y-%m-%d %H:%M:%S')
+        return data
+
+    return [
+        get('index', '/'),
+        get('venues.venues', '/venues'),
+        get('venues.browse_venues', '/venues/browse?genre=Jazz&genre=Blues&match=any'),
+        post('venues.search_venues', '/venues/search', lambda i: {
+            'path': '/venues/search', 'data': {'search_term': 'the'}}),
+        get('venues.show_venue', '/venues/{}'.format(venue_id)),
+        get('venues.create_venue_form', '/venues/create'),
+        post('venues.create_venue_submission', '/venues/create', lambda i: {
+            'path': '/venues/create', 'data': venue_form('New venue {} {}'.format(run_id, i))}),
+        get('venues.edit_venue', '/venues/{}/edit'.format(venue_id)),
+        post('venues.edit_venue_submission', '/venues/<id>/edit', edit(Venue, own_venue_id, venue_form)),
+        Case('venues.delete_venue', 'DELETE /venues/<id>', doomed_venue),
+        get('artists.artists', '/artists'),
+        get('artists.browse_artists', '/artists/browse?genre=Rock'),
+        post('artists.search_artists', '/artists/search', lambda i: {
+            'path': '/artists/search', 'data': {'search_term': 'the'}}),
+        get('artists.show_artist', '/artists/{}'.format(artist_id)),
+        get('artists.create_artist_form', '/artists/create'),
+        post('artists.create_artist_submission', '/artists/create', lambda i: {
+            'path': '/artists/create', 'data': artist_form('New artist {} {}'.format(run_id, i))}),
+        Case('artists.delete_artist', 'DELETE /artists/<id>', doomed_artist),
+        get('artists.edit_artist', '/artists/{}/edit'.format(artist_id)),
+        post('artists.edit_artist_submission', '/artists/<id>/edit', edit(Artist, own_artist_id, artist_form)),
+        get('shows.shows', '/shows'),
+        get('shows.shows', '/shows?scope=all'),
+        get('shows.upcoming', '/upcoming?' + area),
+        get('shows.create_shows', '/shows/create'),
+        post('shows.create_show_submission', '/shows/create', lambda i: {
+            'path': '/shows/create', 'data': {
+                'venue_id': own_venue_id, 'artist_id': own_artist_id, 'duration': 60,
+                'start_time': (booking_start + timedelta(hours=2 * i)).strftime('%Y-%m-%d %H:%M:%S')}}),
+        get('shows.create_tour_form', '/shows/tour'),
+        post('shows.create_tour_submission', '/shows/tour', lambda i: {
+            'path': '/shows/tour', 'data': tour_form(i)}),
+        Case('importer.import_upload', 'POST /import/venues', import_file),
+        get('api.api_venues', '/api/v1/venues'),
+        get('api.api_venue', '/api/v1/venues/{}'.format(venue_id)),
+        get('api.api_browse_venues', '/api/v1/venues/browse?genre=Jazz'),
+        get('api.api_venue_free_slots', '/api/v1/venues/{}/free-slots?start={}'.format(venue_id, today)),
+        get('api.api_artists', '/api/v1/artists'),
+        get('api.api_artist', '/api/v1/artists/{}'.format(artist_id)),
+        get('api.api_browse_artists', '/api/v1/artists/browse?genre=Rock&state={}'.format(state)),
+        get('api.api_free_artists', '/api/v1/artists/free?start={}'.format(today)),
+        get('api.api_shows', '/api/v1/shows'),
+        post('api.api_book_tour', '/api/v1/tours', lambda i: {
+            'path': '/api/v1/tours', 'json': {'artist_id': own_artist_id, 'dates': [
+                {'venue_id': own_venue_id, 'duration': 60,
+                 'start_time': (booking_start + timedelta(days=200, hours=2 * (6 * i + n))).isoformat()}
+                for n in range(6)]}}),
+        get('api.api_upcoming', '/api/v1/upcoming?' + area),
+        get('api.api_export', '/api/v1/export/venues.ndjson'),
+        get('admin.cache_stats', '/admin/cache'),
+        get('admin.query_stats', '/admin/queries'),
+        get('static', '/static/css/main.css'),
+    ]
+
+
+def compare(results, baseline, threshold):
+    # Routes whose p50 grew by more than threshold (a fraction) and 1 ms, or
+    # that run more statements than in the baseline.
+    regressions = []
+    for label, result in results.items():
+        before = baseline.get(label)
+        if before is None:
+            continue
+        if result['p50_ms'] > before['p50_ms'] * (1 + threshold) and result['p50_ms'] - before['p50_ms'] > 1:
+            regressions.append('{}: p50 {:.2f} -> {:.2f} ms'.format(label, before['p50_ms'], result['p50_ms']))
+        if result['queries'] > before['queries']:
+            regressions.append('{}: {} -> {} queries'.format(label, before['queries'], result['queries']))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--output', default='routes.json')
+    parser.add_argument('--compare', metavar='BASELINE_JSON')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--venues', type=int, default=500)
+    parser.add_argument('--artists', type=int, default=1000)
+    parser.add_argument('--shows', type=int, default=50000)
+    parser.add_argument('--skew', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-backend', default='null')
+    parser.add_argument('--quick', action='store_true')
+    args = parser.parse_args()
+    if args.quick:
+        args.venues, args.artists, args.shows, args.repeat, args.warmup = 50, 100, 2000, 3, 1
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ['CACHE_BACKEND'] = args.cache_backend
+    os.environ.setdefault('FYYUR_ENV', 'prod')
+    # One process, so --cache-backend memory is allowed under prod.
+    os.environ.setdefault('WEB_CONCURRENCY', '1')
+    os.environ.setdefault('ADMIN_VIEWS', '1')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from fyyur import create_app
+    from fyyur.extensions import db
+    from fyyur.models import Venue, Artist, Shows
+    from benchmarks.seed import seed
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+
+    with app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            db.session.execute(db.text('CREATE EXTENSION IF NOT EXISTS btree_gist'))
+            db.session.commit()
+        db.create_all(bind_key=None)
+        seeded = db.session.query(Shows.id).first() is None
+        if seeded:
+            seed(args.venues, args.artists, args.shows, args.seed, skew=args.skew)
+        dataset = {
+            'seeded': seeded,
+            'seed_args': {'venues': args.venues, 'artists': args.artists, 'shows': args.shows,
+                          'skew': args.skew, 'seed': args.seed} if seeded else None,
+            'venues': db.session.query(Venue).count(),
+            'artists': db.session.query(Artist).count(),
+            'shows': db.session.query(Shows).count(),
+            'dialect': db.engine.dialect.name,
+        }
+
+    cases = build_cases(app, int(time.time()))
+    uncovered = sorted({rule.endpoint for rule in app.url_map.iter_rules()} - {case.endpoint for case in cases})
+
+    statements = [0]
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+    event.listen(Engine, 'before_cursor_execute', count)
+
+    client = app.test_client()
+
+    def request(case, i):
+        # Returns (ms, statements, status). Streamed bodies are read in full.
+        kwargs = case.prepare(i)
+        statements[0] = 0
+        started = time.perf_counter()
+        response = client.open(**kwargs)
+        response.get_data()
+        ms = (time.perf_counter() - started) * 1000
+        response.close()
+        return ms, statements[0], response.status_code
+
+    results = {}
+    server_errors = []
+    i = 0
+    for case in cases:
+        timings, counts, statuses = [], [], set()
+        for n in range(args.warmup + args.repeat):
+            ms, queries, status = request(case, i)
+            i += 1
+            statuses.add(status)
+            if n >= args.warmup:
+                timings.append(ms)
+                counts.append(queries)
+        results[case.label] = {
+            'endpoint': case.endpoint,
+            'status': sorted(statuses),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'queries': max(counts),
+        }
+        if any(status >= 500 for status in statuses):
+            server_errors.append(case.label)
+
+    tracemalloc.start()
+    for case in cases:
+        kwargs = case.prepare(i)
+        i += 1
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        response = client.open(**kwargs)
+        response.get_data()
+        response.close()
+        results[case.label]['peak_kb'] = round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+    tracemalloc.stop()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'cache_backend': args.cache_backend,
+            'dataset': dataset,
+            'uncovered_endpoints': uncovered,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print('{:<48} {:>8} {:>9} {:>9} {:>8} {:>10}'.format('route', 'status', 'p50 ms', 'p99 ms', 'queries', 'peak KiB'))
+    for label, result in results.items():
+        print('{:<48} {:>8} {:>9.2f} {:>9.2f} {:>8} {:>10.1f}'.format(
+            label, ','.join(map(str, result['status'])), result['p50_ms'], result['p99_ms'],
+            result['queries'], result['peak_kb']))
+    print('results written to {}'.format(args.output))
+    if uncovered:
+        print('routes not benchmarked: {}'.format(', '.join(uncovered)))
+
+    failed = False
+    if server_errors:
+        print('server errors on: {}'.format(', '.join(server_errors)))
+        failed = True
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+        for regression in regressions:
+            print('regression: ' + regression)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
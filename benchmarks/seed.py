@@ -0,0 +1,154 @@
+'''
+Deterministic synthetic data: venues, artists and one-hour shows around an
+anchor date. The same arguments always give the same rows, and rows are
+generated and inserted in chunks, so millions of shows need little memory.
+
+    python -m benchmarks.seed --database-url sqlite:////tmp/fyyur_bench.db \
+        --venues 20000 --artists 50000 --shows 2000000 --skew 2 --future-share 0.3
+
+Shows start on whole hours from --past-days before to --future-days after
+the anchor (today, 00:00 UTC, unless --anchor is given). --skew 0 spreads
+them evenly; higher values bunch them up around the anchor. --future-share
+is the share of upcoming shows. No venue or artist has two shows in the
+same hour, so the Postgres exclusion constraints accept the data.
+'''
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from fyyur.choices import state_choices, genres_choices
+from fyyur.extensions import db
+from fyyur.models import Venue, Artist, Shows
+
+CHUNK_SIZE = 5000
+
+
+def _insert(table, rows):
+    # rows can be any iterable; it is consumed CHUNK_SIZE rows at a time.
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            db.session.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+
+
+def hour_counts(shows, past_hours, future_hours, per_hour, skew, future_share, rng):
+    # Number of shows starting at each hour offset from the anchor. On each
+    # side the weight of an hour is (1 - distance / span) ** skew, and no hour
+    # gets more than per_hour shows.
+    future = round(shows * future_share)
+    counts = {}
+    for hours, side_shows, sign in ((future_hours, future, 1), (past_hours, shows - future, -1)):
+        if side_shows > hours * per_hour:
+            raise ValueError('{} shows do not fit in {} hours with {} venues/artists free per hour'.format(
+                side_shows, hours, per_hour))
+        offsets = range(0, hours) if sign > 0 else range(-1, -hours - 1, -1)
+        weights = [(1 - abs(offset) / (hours + 1)) ** skew for offset in offsets]
+        total = sum(weights)
+        allotted = 0
+        for offset, weight in zip(offsets, weights):
+            counts[offset] = min(int(side_shows * weight / total), per_hour)
+            allotted += counts[offset]
+        # The rounding remainder, and whatever the cap cut off, goes one show
+        # at a time to random hours that still have room.
+        open_offsets = [offset for offset in offsets if counts[offset] < per_hour]
+        while allotted < side_shows:
+            offset = rng.choice(open_offsets)
+            if counts[offset] < per_hour:
+                counts[offset] += 1
+                allotted += 1
+    return counts
+
+
+def seed(venues=1000, artists=1000, shows=100000, seed=0, past_days=365, future_days=365,
+         skew=0.0, future_share=0.5, anchor=None):
+    # Inserts and commits the rows, then brings the upcoming show counters
+    # and the UpcomingByArea table up to date.
+    from fyyur.areas import rebuild_table
+    from fyyur.queries import refresh_counters
+
+    rng = random.Random(seed)
+    states = [value for value, label in state_choices]
+    genres = [value for value, label in genres_choices]
+    if anchor is None:
+        anchor = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def entity(kind, i):
+        return {
+            'name': '{} {} {}'.format(rng.choice(['The', 'Big', 'Little', 'Blue']), kind, i),
+            'city': 'City {}'.format(rng.randrange(50)),
+            'state': rng.choice(states),
+            'phone': '555-{:04d}'.format(i % 10000),
+            'genres': rng.sample(genres, rng.randint(1, 3)),
+            'image_link': 'https://example.com/{}/{}.jpg'.format(kind.lower(), i),
+            'facebook_link': 'https://www.facebook.com/{}{}'.format(kind.lower(), i),
+        }
+
+    _insert(Venue.__table__, (dict(entity('Venue', i), address='{} Main St'.format(i),
+                                   seeking_talent=rng.random() < 0.2) for i in range(venues)))
+    _insert(Artist.__table__, (dict(entity('Artist', i), seeking_venue=rng.random() < 0.2)
+                               for i in range(artists)))
+    venue_ids = [id for (id,) in db.session.query(Venue.id).order_by(Venue.id)]
+    artist_ids = [id for (id,) in db.session.query(Artist.id).order_by(Artist.id)]
+
+    # Venues and artists are each drawn without replacement within an hour,
+    # so nobody is double-booked.
+    counts = hour_counts(shows, past_days * 24, future_days * 24, min(len(venue_ids), len(artist_ids)),
+                         skew, future_share, rng)
+
+    def show_rows():
+        for offset in sorted(counts):
+            start_time = anchor + timedelta(hours=offset)
+            count = counts[offset]
+            for venue_id, artist_id in zip(rng.sample(venue_ids, count), rng.sample(artist_ids, count)):
+                yield {
+                    'venue_id': venue_id,
+                    'artist_id': artist_id,
+                    'start_time': start_time,
+                    'duration': 60,
+                }
+
+    _insert(Shows.__table__, show_rows())
+    db.session.commit()
+    refresh_counters(Venue)
+    refresh_counters(Artist)
+    rebuild_table()
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--venues', type=int, default=1000)
+    parser.add_argument('--artists', type=int, default=1000)
+    parser.add_argument('--shows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--past-days', type=int, default=365)
+    parser.add_argument('--future-days', type=int, default=365)
+    parser.add_argument('--skew', type=float, default=0.0)
+    parser.add_argument('--future-share', type=float, default=0.5)
+    parser.add_argument('--anchor', type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    os.environ['DATABASE_URL'] = args.database_url
+
+    from fyyur import create_app
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            db.session.execute(db.text('CREATE EXTENSION IF NOT EXISTS btree_gist'))
+            db.session.commit()
+        db.create_all(bind_key=None)
+        if db.session.query(Shows.id).first() is not None:
+            parser.error('the database already has shows, use an empty one')
+        seed(args.venues, args.artists, args.shows, args.seed, args.past_days, args.future_days,
+             args.skew, args.future_share, args.anchor)
+        print('seeded {} venues, {} artists and {} shows'.format(args.venues, args.artists, args.shows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+Time to first byte, total time and peak Python memory of the listing pages
+with STREAM_LISTINGS off and on. Requests go through the Flask test client
+unbuffered, so the first chunk is timed as the app yields it. Memory is
+measured in a separate tracemalloc pass. The response cache is disabled.
+
+    python -m benchmarks.streaming --database-url sqlite:////tmp/fyyur_stream.db --artists 100000
+
+An empty database is seeded first; a seeded one is used as it is.
+'''
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--venues', type=int, default=20000)
+    parser.add_argument('--artists', type=int, default=50000)
+    parser.add_argument('--shows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ['CACHE_BACKEND'] = 'null'
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+    from fyyur import create_app
+    from fyyur.extensions import db
+    from fyyur.models import Shows
+    from benchmarks.seed import seed
+    app = create_app()
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        if db.session.query(Shows.id).first() is None:
+            seed(args.venues, args.artists, args.shows)
+
+    client = app.test_client()
+    paths = ['/venues', '/artists', '/shows?scope=all&page_size={}'.format(app.config['SHOWS_MAX_PAGE_SIZE'])]
+
+    def request(path):
+        started = time.perf_counter()
+        response = client.get(path, buffered=False)
+        chunks = iter(response.response)
+        size = len(next(chunks))
+        first = time.perf_counter() - started
+        for chunk in chunks:
+            size += len(chunk)
+        response.close()
+        return first * 1000, (time.perf_counter() - started) * 1000, size
+
+    print('{:<34} {:>6} {:>10} {:>10} {:>10} {:>12}'.format('page', 'mode', 'ttfb ms', 'total ms', 'peak KiB', 'bytes'))
+    for path in paths:
+        for mode in (False, True):
+            app.config['STREAM_LISTINGS'] = mode
+            request(path)
+            timings = [request(path) for i in range(args.repeat)]
+            tracemalloc.start()
+            size = request(path)[2]
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print('{:<34} {:>6} {:>10.1f} {:>10.1f} {:>10.0f} {:>12}'.format(
+                path, 'stream' if mode else 'render',
+                statistics.median(first for first, total, size in timings),
+                statistics.median(total for first, total, size in timings),
+                peak / 1024, size))
+
+
+if __name__ == '__main__':
+    main()
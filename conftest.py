@@ -0,0 +1,10 @@
+# Tests run under the test profile against an in-memory SQLite database,
+# whatever the shell exports; config.py reads these when fyyur is imported.
+import os
+
+os.environ['FYYUR_ENV'] = 'test'
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['CACHE_BACKEND'] = 'null'
+os.environ['ASYNC_DETAIL_PAGES'] = '0'
+os.environ['STREAM_LISTINGS'] = '0'
+os.environ.pop('DATABASE_REPLICA_URLS', None)
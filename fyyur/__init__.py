@@ -0,0 +1,66 @@
+#----------------------------------------------------------------------------#
+# Application factory.
+#----------------------------------------------------------------------------#
+
+import logging
+import os
+from logging import Formatter, FileHandler
+
+from flask import Flask, render_template
+
+from fyyur.extensions import db, migrate, moment, cache, instrumentation, replicas, async_db, assets
+
+# templates/, static/ and config.py live next to the package.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(config='config'):
+    app = Flask(__name__, root_path=PROJECT_ROOT)
+    app.config.from_object(config)
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
+
+    # Registers the replicas as extra binds, so it runs before db.init_app.
+    replicas.init_app(app)
+    db.init_app(app)
+    with app.app_context():
+        replicas.setup_engines(db)
+    async_db.init_app(app)
+    migrate.init_app(app, db)
+    moment.init_app(app)
+    cache.init_app(app)
+    instrumentation.init_app(app)
+    assets.init_app(app)
+
+    # Importing the models registers them on db.metadata for migrations.
+    from fyyur import models
+    from fyyur.filters import format_datetime
+    app.jinja_env.filters['datetime'] = format_datetime
+
+    from fyyur import venues, artists, shows, api, importer, admin
+    for module in (venues, artists, shows, api, importer, admin):
+        app.register_blueprint(module.bp)
+
+    @app.route('/')
+    def index():
+        return render_template('pages/home.html')
+
+    @app.errorhandler(404)
+    def not_found_error(error):
+        return render_template('errors/404.html'), 404
+
+    @app.errorhandler(500)
+    def server_error(error):
+        return render_template('errors/500.html'), 500
+
+    if not app.debug and not app.testing:
+        file_handler = FileHandler('error.log')
+        file_handler.setFormatter(
+            Formatter(
+                '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]')
+        )
+        app.logger.setLevel(logging.INFO)
+        file_handler.setLevel(logging.INFO)
+        app.logger.addHandler(file_handler)
+        app.logger.info('errors')
+
+    return app
@@ -0,0 +1,115 @@
+#----------------------------------------------------------------------------#
+# Admin.
+#----------------------------------------------------------------------------#
+
+import hmac
+import os
+from datetime import datetime
+
+import click
+from flask import Blueprint, abort, current_app, request
+
+from fyyur.extensions import db, cache, instrumentation
+from fyyur.models import Venue, Artist
+from fyyur.queries import refresh_counters
+from fyyur.areas import refresh_upcoming_areas, install_triggers, drop_triggers
+from fyyur.assets import BUNDLES, build
+from fyyur.deletion import purge_deleted
+
+bp = Blueprint('admin', __name__, url_prefix='/admin', cli_group=None)
+
+
+@bp.before_request
+def require_admin():
+    # The CLI commands below are not requests and are not affected.
+    if not current_app.config['ADMIN_VIEWS']:
+        abort(404)
+    token = current_app.config['ADMIN_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), 'Bearer ' + token):
+        abort(401)
+
+
+@bp.route('/cache')
+def cache_stats():
+    return cache.stats_view()
+
+
+@bp.route('/queries')
+def query_stats():
+    return instrumentation.stats_view()
+
+
+@bp.cli.command('roll-forward-counters')
+@click.option('--all', 'rebuild', is_flag=True, help='Recompute every row, not only the stale ones.')
+def roll_forward_counters(rebuild):
+    # Moves shows whose start_time has passed from upcoming to past. Run it
+    # periodically (e.g. every minute from cron) with `flask roll-forward-counters`.
+    for model in (Venue, Artist):
+        criteria = [] if rebuild else [model.next_show_time <= datetime.utcnow()]
+        updated = refresh_counters(model, *criteria)
+        click.echo('{}: {} rows updated'.format(model.__tablename__, updated))
+    db.session.commit()
+    cache.invalidate('venues')
+
+
+@bp.cli.command('purge-deleted')
+@click.option('--days', type=int, help='Purge rows deleted at least this many days ago '
+              '(default PURGE_AFTER_DAYS, or 0 with DELETE_MODE=hard).')
+def purge_deleted_entities(days):
+    # Periodic job, e.g. nightly from cron: removes soft-deleted venues and
+    # artists and their remaining shows, in short transactions.
+    purged = 0
+    for model, entity_id, shows in purge_deleted(days):
+        click.echo('{} {}: purged with {} shows'.format(model.__tablename__, entity_id, shows))
+        purged += 1
+    click.echo('{} venues and artists purged'.format(purged))
+
+
+@bp.cli.group('upcoming-area', help='Maintain the data behind the upcoming-near-me page.')
+def upcoming_area():
+    pass
+
+
+@upcoming_area.command('refresh')
+def refresh_upcoming_area():
+    # Periodic job: refreshes the view or rebuilds the summary table, or only
+    # prunes started shows when the triggers keep the table current.
+    click.echo(refresh_upcoming_areas())
+    db.session.commit()
+    cache.invalidate('upcoming')
+
+
+@upcoming_area.command('install-triggers')
+def install_upcoming_triggers():
+    # Switches the summary table to trigger-driven incremental refresh.
+    rows = install_triggers()
+    db.session.commit()
+    cache.invalidate('upcoming')
+    click.echo('UpcomingByArea: {} rows rebuilt, triggers installed'.format(rows))
+
+
+@upcoming_area.command('drop-triggers')
+def drop_upcoming_triggers():
+    drop_triggers()
+    db.session.commit()
+    click.echo('UpcomingByArea triggers dropped')
+
+
+@bp.cli.group('assets', help='Build the static asset bundles.')
+def assets_group():
+    pass
+
+
+@assets_group.command('build')
+def build_assets():
+    # Run on deploy, before the workers start: they read the manifest once.
+    static_folder = current_app.static_folder
+    manifest = build(static_folder)
+    for name, sources in sorted(BUNDLES.items()):
+        source_bytes = sum(os.path.getsize(os.path.join(static_folder, source)) for source in sources)
+        built = os.path.join(static_folder, manifest[name])
+        sizes = ['{} {}'.format(suffix, os.path.getsize(built + suffix))
+                 for suffix in ('.gz', '.br') if os.path.exists(built + suffix)]
+        click.echo('{}: {} files, {} bytes -> {} {} ({})'.format(
+            name, len(sources), source_bytes, manifest[name], os.path.getsize(built), ', '.join(sizes)))
+    click.echo('{} files in the manifest'.format(len(manifest)))
@@ -0,0 +1,91 @@
+#----------------------------------------------------------------------------#
+# Async query path.
+#
+# With ASYNC_DETAIL_PAGES on, the venue and artist pages issue their
+# independent statements concurrently through SQLAlchemy's asyncio engine.
+# The engine and its pool live on one event loop per worker process, run in
+# a background thread and started lazily (so after a pre-fork server has
+# forked). Request threads submit coroutines to it and wait for the result;
+# a pooled asyncpg/aiosqlite connection is only usable from the loop that
+# opened it, which rules out a fresh loop per request. Each read replica
+# gets an async engine too, and a request reads from the replica the
+# ReplicaRouter picked for it.
+#----------------------------------------------------------------------------#
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+
+from flask import current_app
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_url(url):
+    # postgresql://... -> postgresql+asyncpg://..., sqlite:///x -> sqlite+aiosqlite:///x
+    scheme, rest = url.split('://', 1)
+    return '{}://{}'.format(ASYNC_DRIVERS.get(scheme.split('+')[0], scheme), rest)
+
+
+class AsyncDatabase(object):
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.loop = None
+        self.engines = {}
+        self.sessionmakers = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASYNC_DETAIL_PAGES', False)
+        if not app.config.get('SQLALCHEMY_ASYNC_DATABASE_URI'):
+            app.config['SQLALCHEMY_ASYNC_DATABASE_URI'] = async_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        app.config.setdefault('SQLALCHEMY_ASYNC_ENGINE_OPTIONS', {})
+        # Keyed like the replica binds; run after ReplicaRouter.init_app.
+        app.config.setdefault('SQLALCHEMY_ASYNC_REPLICA_URIS', {
+            'replica_{}'.format(i): async_url(uri)
+            for i, uri in enumerate(app.config.get('SQLALCHEMY_REPLICA_URIS', []))
+        })
+        app.extensions['async_db'] = self
+
+    def _start(self):
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        config = current_app.config
+        # aiosqlite logs every operation at DEBUG.
+        logging.getLogger('aiosqlite').setLevel(logging.INFO)
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name='fyyur-async-db', daemon=True).start()
+        urls = dict(config['SQLALCHEMY_ASYNC_REPLICA_URIS'])
+        urls[None] = config['SQLALCHEMY_ASYNC_DATABASE_URI']
+        self.engines = {key: create_async_engine(url, **config['SQLALCHEMY_ASYNC_ENGINE_OPTIONS'])
+                        for key, url in urls.items()}
+        self.sessionmakers = {key: async_sessionmaker(engine, expire_on_commit=False)
+                              for key, engine in self.engines.items()}
+        self.pid = os.getpid()
+
+    def run(self, coro):
+        # Runs coro on the loop and blocks until it finishes. The caller's
+        # context (the Flask app and request) is copied into the task, so
+        # current_app, g and the SQL instrumentation keep working.
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self._start()
+        context = contextvars.copy_context()
+        return context.run(asyncio.run_coroutine_threadsafe, coro, self.loop).result()
+
+    # replica is a replica bind key, or None for the primary.
+    async def scalar(self, statement, replica=None):
+        async with self.sessionmakers[replica]() as session:
+            return await session.scalar(statement)
+
+    async def all(self, statement, replica=None):
+        async with self.sessionmakers[replica]() as session:
+            return (await session.execute(statement)).all()
@@ -0,0 +1,191 @@
+#----------------------------------------------------------------------------#
+# JSON API.
+#----------------------------------------------------------------------------#
+
+import json
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, Response, abort, current_app, request, stream_with_context
+from sqlalchemy.exc import SQLAlchemyError
+
+from fyyur.extensions import db, cache
+from fyyur.models import Shows, Venue, Artist, MAX_TOUR_SHOWS
+from fyyur.queries import (venue_areas, venue_detail, artist_detail, artist_list, decode_show_cursor, show_listing,
+                           get_live, live)
+from fyyur.scheduling import free_slots, free_artists, book_shows, booking_tags
+from fyyur.areas import upcoming_in_area
+from fyyur.facets import browse, parse_filters
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+EXPORTS = {'venues': Venue, 'artists': Artist, 'shows': Shows}
+
+
+def json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+
+def sparse(data):
+    # ?fields=id,name keeps only the listed top-level fields of each object.
+    fields = request.args.get('fields')
+    if not fields:
+        return data
+    fields = set(fields.split(','))
+    if isinstance(data, list):
+        return [sparse(item) for item in data]
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def time_window(default_days=1, max_days=366):
+    # ?start=&end= as ISO dates or datetimes; end defaults to start plus
+    # default_days. Invalid or oversized windows are a 400.
+    try:
+        start = datetime.fromisoformat(request.args['start'])
+        end = datetime.fromisoformat(request.args['end']) if request.args.get('end') \
+            else start + timedelta(days=default_days)
+    except (KeyError, ValueError):
+        abort(400)
+    if not start < end <= start + timedelta(days=max_days):
+        abort(400)
+    return start, end
+
+
+def api_response(data):
+    # Strong ETag over the body; unchanged resources answer 304.
+    response = current_app.response_class(
+        json.dumps(data, default=json_default), mimetype='application/json')
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@bp.route('/venues')
+def api_venues():
+    return api_response({'areas': [dict(area, venues=sparse(area['venues'])) for area in venue_areas()]})
+
+
+@bp.route('/venues/browse')
+def api_browse_venues():
+    page = max(request.args.get('page', 1, type=int), 1)
+    return api_response(browse(Venue, parse_filters(request.args), page))
+
+
+@bp.route('/venues/<int:venue_id>')
+def api_venue(venue_id):
+    data = venue_detail(venue_id)
+    if not data:
+        abort(404)
+    return api_response(sparse(data))
+
+
+@bp.route('/venues/<int:venue_id>/free-slots')
+def api_venue_free_slots(venue_id):
+    if get_live(Venue, venue_id) is None:
+        abort(404)
+    start, end = time_window(default_days=7)
+    slots = free_slots(venue_id, start, end, max(request.args.get('min_minutes', 0, type=int), 0))
+    return api_response({'venue_id': venue_id, 'start': start, 'end': end, 'free_slots': slots})
+
+
+@bp.route('/artists')
+def api_artists():
+    return api_response({'artists': sparse(artist_list())})
+
+
+@bp.route('/artists/browse')
+def api_browse_artists():
+    page = max(request.args.get('page', 1, type=int), 1)
+    return api_response(browse(Artist, parse_filters(request.args), page))
+
+
+@bp.route('/artists/free')
+def api_free_artists():
+    # ?start=2026-11-07 lists the artists with no show that day.
+    start, end = time_window()
+    return api_response({'start': start, 'end': end, 'artists': sparse(free_artists(start, end))})
+
+
+@bp.route('/artists/<int:artist_id>')
+def api_artist(artist_id):
+    data = artist_detail(artist_id)
+    if not data:
+        abort(404)
+    return api_response(sparse(data))
+
+
+@bp.route('/shows')
+def api_shows():
+    try:
+        after = decode_show_cursor(request.args['after']) if request.args.get('after') else None
+    except ValueError:
+        abort(400)
+    data, next_cursor = show_listing(
+        after=after,
+        upcoming_only=request.args.get('scope', 'upcoming') != 'all',
+        page_size=request.args.get('page_size', type=int)
+    )
+    return api_response({'shows': sparse(data), 'next': next_cursor})
+
+
+@bp.route('/tours', methods=['POST'])
+def api_book_tour():
+    # {"artist_id": 4, "dates": [{"venue_id": 1, "start_time": "2026-11-07T20:00", "duration": 90}, ...]},
+    # or a venue_id with an artist_id per date. Every date is booked in one
+    # transaction, or with "all_or_nothing": false only the free ones. 201
+    # when all were booked, 409 when none were, 200 otherwise.
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('dates'), list) \
+            or not 0 < len(payload['dates']) <= MAX_TOUR_SHOWS \
+            or not all(isinstance(date, dict) for date in payload['dates']):
+        abort(400)
+    fixed = {key: payload[key] for key in ('venue_id', 'artist_id') if key in payload}
+    try:
+        results = book_shows([dict(date, **fixed) for date in payload['dates']],
+                             payload.get('all_or_nothing', True) is not False)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    cache.invalidate(*booking_tags(results))
+    booked = sum(result['status'] == 'booked' for result in results)
+    status = 201 if booked == len(results) else 409 if not booked else 200
+    return current_app.response_class(
+        json.dumps({'booked': booked, 'results': results}, default=json_default),
+        status=status, mimetype='application/json')
+
+
+@bp.route('/upcoming')
+def api_upcoming():
+    # ?state=CA&city=San Francisco&days=7: the area's shows grouped by day.
+    state, city = request.args.get('state'), request.args.get('city')
+    if not state or not city:
+        abort(400)
+    days = min(max(request.args.get('days', 7, type=int), 1), 31)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+    return api_response({'state': state, 'city': city, 'days': upcoming_in_area(state, city, days, limit)})
+
+
+@bp.route('/export/<table>.ndjson')
+def api_export(table):
+    # Full table dump, one JSON object per line, without soft-deleted venues
+    # and artists or their shows. Rows are fetched in batches (a server-side
+    # cursor on Postgres) so memory stays flat.
+    model = EXPORTS.get(table)
+    if model is None:
+        abort(404)
+    columns = [column for column in model.__table__.columns if column.name != 'deleted_at']
+
+    def generate():
+        query = db.session.query(*columns)
+        if model is Shows:
+            query = query.join(Venue, Shows.venue_id == Venue.id).join(Artist, Shows.artist_id == Artist.id) \
+                .filter(live(Venue), live(Artist))
+        else:
+            query = query.filter(live(model))
+        rows = query.order_by(model.id).yield_per(1000)
+        for row in rows:
+            yield json.dumps(row._asdict(), default=json_default) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,195 @@
+#----------------------------------------------------------------------------#
+# Upcoming shows by area.
+#
+# "Upcoming near me" reads upcoming shows of one city/state from a
+# denormalised copy indexed on (state, city, start_time), so a page costs one
+# index range scan however many shows there are. The copy is either
+#
+#   'view'   the UpcomingByAreaView materialized view (Postgres), refreshed
+#            with REFRESH ... CONCURRENTLY so readers are never blocked, or
+#   'table'  the portable UpcomingByArea summary table, rebuilt in one
+#            transaction,
+#
+# chosen by UPCOMING_AREA_SOURCE. Both are refreshed by the periodic
+# `flask upcoming-area refresh`. `flask upcoming-area install-triggers`
+# instead keeps the table current with database triggers on Shows, Venue and
+# Artist; refresh then only prunes shows that have started.
+#----------------------------------------------------------------------------#
+
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from flask import current_app
+from sqlalchemy import Column, MetaData, Table, delete, func, insert, select, text
+
+from fyyur.extensions import db
+from fyyur.models import Shows, Venue, Artist, UpcomingByArea
+from fyyur.queries import is_postgres, live
+
+COLUMNS = [column.name for column in UpcomingByArea.__table__.columns]
+
+# Created by migration 5b8d2f0c6e91 on Postgres only, so it is kept out of
+# db.metadata.
+upcoming_view = Table('UpcomingByAreaView', MetaData(),
+                      *[Column(column.name, column.type) for column in UpcomingByArea.__table__.columns])
+
+
+def upcoming_select(after):
+    return select(
+        Shows.id, Venue.state, Venue.city, func.date(Shows.start_time), Shows.start_time,
+        Venue.id, Venue.name, Artist.id, Artist.name, Artist.image_link,
+    ).join(Venue, Shows.venue_id == Venue.id) \
+        .join(Artist, Shows.artist_id == Artist.id) \
+        .where(Shows.start_time > after, live(Venue), live(Artist))
+
+
+def source_name():
+    return current_app.config['UPCOMING_AREA_SOURCE'] or ('view' if is_postgres() else 'table')
+
+
+def upcoming_source():
+    return upcoming_view if source_name() == 'view' else UpcomingByArea.__table__
+
+
+def upcoming_in_area(state, city, days=7, limit=100):
+    # The next `days` days of shows in one area, grouped by day.
+    table = upcoming_source()
+    now = datetime.utcnow()
+    rows = db.session.execute(
+        select(table).where(
+            table.c.state == state, table.c.city == city,
+            table.c.start_time > now, table.c.start_time < now + timedelta(days=days),
+        ).order_by(table.c.start_time, table.c.show_id).limit(limit)
+    )
+    return [{
+        'day': day,
+        'shows': [{
+            'venue_id': row.venue_id,
+            'venue_name': row.venue_name,
+            'artist_id': row.artist_id,
+            'artist_name': row.artist_name,
+            'artist_image_link': row.artist_image_link,
+            'start_time': row.start_time,
+        } for row in day_rows],
+    } for day, day_rows in groupby(rows, key=lambda row: row.day)]
+
+
+#----------------------------------------------------------------------------#
+# Refresh.
+#----------------------------------------------------------------------------#
+
+SELECT_SQL = '''SELECT s.id, v.state, v.city, date(s.start_time), s.start_time,
+    v.id, v.name, a.id, a.name, a.image_link
+    FROM "Shows" s JOIN "Venue" v ON v.id = s.venue_id JOIN "Artist" a ON a.id = s.artist_id'''
+INSERT_SQL = 'INSERT INTO "UpcomingByArea" ({}) {} WHERE s.id = NEW.id ' \
+    'AND v.deleted_at IS NULL AND a.deleted_at IS NULL'.format(', '.join(COLUMNS), SELECT_SQL)
+VENUE_SQL = 'UPDATE "UpcomingByArea" SET venue_name = NEW.name, city = NEW.city, state = NEW.state WHERE venue_id = NEW.id'
+ARTIST_SQL = 'UPDATE "UpcomingByArea" SET artist_name = NEW.name, artist_image_link = NEW.image_link WHERE artist_id = NEW.id'
+
+# Triggers copy every inserted show, past or not; refresh prunes them.
+TRIGGERS = {
+    'postgresql': {
+        'create': [
+            '''CREATE FUNCTION upcoming_by_area_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_TABLE_NAME = 'Shows' THEN
+                    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                        DELETE FROM "UpcomingByArea" WHERE show_id = OLD.id;
+                    END IF;
+                    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                        {};
+                    END IF;
+                ELSIF TG_TABLE_NAME = 'Venue' THEN
+                    {};
+                ELSE
+                    {};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql'''.format(INSERT_SQL, VENUE_SQL, ARTIST_SQL),
+            'CREATE TRIGGER upcoming_by_area_shows AFTER INSERT OR UPDATE OR DELETE ON "Shows" '
+            'FOR EACH ROW EXECUTE FUNCTION upcoming_by_area_sync()',
+            'CREATE TRIGGER upcoming_by_area_venue AFTER UPDATE OF name, city, state ON "Venue" '
+            'FOR EACH ROW EXECUTE FUNCTION upcoming_by_area_sync()',
+            'CREATE TRIGGER upcoming_by_area_artist AFTER UPDATE OF name, image_link ON "Artist" '
+            'FOR EACH ROW EXECUTE FUNCTION upcoming_by_area_sync()',
+        ],
+        'drop': [
+            'DROP TRIGGER IF EXISTS upcoming_by_area_shows ON "Shows"',
+            'DROP TRIGGER IF EXISTS upcoming_by_area_venue ON "Venue"',
+            'DROP TRIGGER IF EXISTS upcoming_by_area_artist ON "Artist"',
+            'DROP FUNCTION IF EXISTS upcoming_by_area_sync()',
+        ],
+        'installed': "SELECT count(*) FROM pg_trigger WHERE tgname = 'upcoming_by_area_shows'",
+    },
+    'sqlite': {
+        'create': [
+            'CREATE TRIGGER upcoming_by_area_show_insert AFTER INSERT ON "Shows" BEGIN {}; END'.format(INSERT_SQL),
+            'CREATE TRIGGER upcoming_by_area_show_update AFTER UPDATE ON "Shows" BEGIN '
+            'DELETE FROM "UpcomingByArea" WHERE show_id = OLD.id; {}; END'.format(INSERT_SQL),
+            'CREATE TRIGGER upcoming_by_area_show_delete AFTER DELETE ON "Shows" BEGIN '
+            'DELETE FROM "UpcomingByArea" WHERE show_id = OLD.id; END',
+            'CREATE TRIGGER upcoming_by_area_venue AFTER UPDATE OF name, city, state ON "Venue" '
+            'BEGIN {}; END'.format(VENUE_SQL),
+            'CREATE TRIGGER upcoming_by_area_artist AFTER UPDATE OF name, image_link ON "Artist" '
+            'BEGIN {}; END'.format(ARTIST_SQL),
+        ],
+        'drop': [
+            'DROP TRIGGER IF EXISTS upcoming_by_area_show_insert',
+            'DROP TRIGGER IF EXISTS upcoming_by_area_show_update',
+            'DROP TRIGGER IF EXISTS upcoming_by_area_show_delete',
+            'DROP TRIGGER IF EXISTS upcoming_by_area_venue',
+            'DROP TRIGGER IF EXISTS upcoming_by_area_artist',
+        ],
+        'installed': "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'upcoming_by_area_show_insert'",
+    },
+}
+
+
+def dialect_triggers():
+    triggers = TRIGGERS.get(db.engine.dialect.name)
+    if triggers is None:
+        raise RuntimeError('No upcoming-area triggers for {}'.format(db.engine.dialect.name))
+    return triggers
+
+
+def triggers_installed():
+    triggers = TRIGGERS.get(db.engine.dialect.name)
+    return bool(triggers and db.session.execute(text(triggers['installed'])).scalar())
+
+
+def rebuild_table():
+    db.session.execute(delete(UpcomingByArea))
+    return db.session.execute(
+        insert(UpcomingByArea).from_select(COLUMNS, upcoming_select(datetime.utcnow()))
+    ).rowcount
+
+
+def refresh_upcoming_areas():
+    # Returns a one-line summary for the CLI. The caller commits.
+    if source_name() == 'view':
+        db.session.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY "UpcomingByAreaView"'))
+        return 'UpcomingByAreaView refreshed'
+    if triggers_installed():
+        pruned = db.session.execute(
+            delete(UpcomingByArea).where(UpcomingByArea.start_time <= datetime.utcnow())
+        ).rowcount
+        return 'UpcomingByArea: {} started shows pruned'.format(pruned)
+    return 'UpcomingByArea: {} rows rebuilt'.format(rebuild_table())
+
+
+def install_triggers():
+    # Rebuilds the table and creates the triggers in one transaction, so no
+    # write falls between the two.
+    triggers = dialect_triggers()
+    for statement in triggers['drop']:
+        db.session.execute(text(statement))
+    rows = rebuild_table()
+    for statement in triggers['create']:
+        db.session.execute(text(statement))
+    return rows
+
+
+def drop_triggers():
+    for statement in dialect_triggers()['drop']:
+        db.session.execute(text(statement))
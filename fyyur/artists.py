@@ -0,0 +1,192 @@
+#----------------------------------------------------------------------------#
+# Artists.
+#----------------------------------------------------------------------------#
+
+import sys
+
+from flask import Blueprint, render_template, request, flash, redirect, url_for, abort, jsonify
+
+from fyyur.choices import state_choices
+from fyyur.deletion import delete_entity
+from fyyur.editing import EditConflict, apply_edit, conflicting_fields, edit_tags, form_values
+from fyyur.extensions import db, cache
+from fyyur.facets import browse, parse_filters
+from fyyur.models import Artist
+from fyyur.queries import artist_detail, iter_artists, search_entities, get_live
+from fyyur.routing import read_only
+from fyyur.streaming import render_listing
+
+bp = Blueprint('artists', __name__)
+
+
+@bp.route('/artists')
+@cache.cached(lambda: ['artists'])
+def artists():
+    return render_listing('pages/artists.html', artists=iter_artists())
+
+
+@bp.route('/artists/browse')
+@cache.cached(lambda: ['artists'])
+def browse_artists():
+    filters = parse_filters(request.args)
+    page = max(request.args.get('page', 1, type=int), 1)
+    results = browse(Artist, filters, page)
+    return render_template('pages/browse.html', kind='artists', results=results, filters=filters,
+                           states=state_choices)
+
+
+@bp.route('/artists/search', methods=['POST'])
+@read_only
+def search_artists():
+    search_term = request.form.get('search_term', '')
+    page = request.form.get('page', 1, type=int)
+    response = search_entities(Artist, search_term, max(page, 1))
+    return render_template('pages/search_artists.html', results=response, search_term=search_term)
+
+
+@bp.route('/artists/<int:artist_id>')
+@cache.cached(lambda artist_id: ['artist:{}'.format(artist_id)])
+def show_artist(artist_id):
+    data = artist_detail(artist_id)
+    if(not data):
+        flash("There is no Artist with id {}.".format(artist_id))
+        return render_template('pages/home.html')
+
+    return render_template('pages/show_artist.html', artist=data)
+
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    from fyyur.forms import ArtistForm
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    from fyyur.forms import ArtistForm
+    # called upon submitting the new artist listing form
+    error = False
+    try:
+        form = ArtistForm()
+        new_artist =    Artist(
+            name =  form.name.data,
+            city = form.city.data,
+            state = form.state.data,
+            phone = form.phone.data,
+            genres = form.genres.data,
+            facebook_link = form.facebook_link.data
+        )
+        db.session.add(new_artist)
+        db.session.commit()
+        cache.invalidate('artists')
+        flash('Artist ' + form.name.data + ' was successfully listed!')
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if(error):
+        flash('Artist ' + request.form['name'] + ' was successfully listed!')
+        abort(400)
+    else:
+        flash('The Artist was successfully created')
+        return render_template('pages/home.html')
+
+
+@bp.route('/artists/<int:artist_id>', methods=['DELETE'])
+def delete_artist(artist_id):
+    error = False
+    deleted = False
+    try:
+        deleted = delete_entity(Artist, artist_id)
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if error:
+        return jsonify({'success': False}), 500
+    if not deleted:
+        return jsonify({'success': False}), 404
+    return jsonify({'success': True})
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    from fyyur.forms import EditArtistForm
+    form = EditArtistForm()
+    aux_artist = get_live(Artist, artist_id)
+    if aux_artist is None:
+        abort(404)
+    form.name.data = aux_artist.name
+    form.genres.data = aux_artist.genres
+    form.city.data =  aux_artist.city
+    form.state.data = aux_artist.state
+    form.phone.data = aux_artist.phone
+    form.facebook_link.data = aux_artist.facebook_link
+    form.image_link.data = aux_artist.image_link
+
+    artist = {
+        "id": artist_id,
+        "name": aux_artist.name,
+        "genres": aux_artist.genres,
+        "city": aux_artist.city,
+        "state": aux_artist.state,
+        "phone": aux_artist.phone,
+        "website": aux_artist.website,
+        "facebook_link": aux_artist.facebook_link,
+        "seeking_venue": aux_artist.seeking_venue if aux_artist.seeking_venue else False,
+        "seeking_description": aux_artist.seeking_description,
+        "image_link": aux_artist.image_link,
+        "version": aux_artist.version,
+    }
+    return render_template('forms/edit_artist.html', form=form, artist=artist, conflicts=None)
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    # Same optimistic edit as edit_venue_submission.
+    from fyyur.forms import EditArtistForm
+    form = EditArtistForm()
+    artist = {'id': artist_id, 'name': form.name.data, 'version': form.version.data}
+    if not form.validate():
+        for field, messages in form.errors.items():
+            for message in messages:
+                flash('{}: {}'.format(field, message))
+        return render_template('forms/edit_artist.html', form=form, artist=artist, conflicts=None), 400
+
+    error = False
+    changed = None
+    conflicts = None
+    values = form_values(form)
+    try:
+        changed = apply_edit(Artist, artist_id, form.version.data, values)
+        tags = edit_tags(Artist, artist_id, changed) if changed else []
+        db.session.commit()
+        cache.invalidate(*tags)
+    except EditConflict as conflict:
+        if conflict.current is not None:
+            conflicts = conflicting_fields(conflict.current, values) or None
+            artist['version'] = conflict.current.version
+            changed = set() if conflicts is None else None
+        db.session.rollback()
+    except:
+        print(sys.exc_info())
+        error = True
+        db.session.rollback()
+    finally:
+        db.session.close()
+    if(error):
+        flash('An error occurred while updating the artist.')
+        return render_template('pages/home.html')
+    elif conflicts is not None:
+        flash('Someone else saved this artist while you were editing it. Their values are shown below; '
+              'save again to replace them with yours.')
+        return render_template('forms/edit_artist.html', form=form, artist=artist, conflicts=conflicts), 409
+    elif changed is None:
+        abort(404)
+    else:
+        return redirect(url_for('artists.show_artist', artist_id=artist_id))
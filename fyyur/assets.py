@@ -0,0 +1,218 @@
+#----------------------------------------------------------------------------#
+# Static asset pipeline.
+#
+# `flask assets build` writes static/dist/: each of the BUNDLES concatenated
+# and minified into one file, and a copy of every other static file, all
+# under content-hashed names. Compressible files also get .gz and, when the
+# brotli package is installed, .br copies. manifest.json maps source names to
+# built ones. With ASSETS_BUNDLED on:
+#
+#   - asset_urls('main.css') in a template gives the bundle's URL;
+#   - url_for('static', filename=...) gives the hashed copy of a file;
+#   - files under dist/ are served with a one-year immutable Cache-Control,
+#     as the precompressed copy the client accepts.
+#
+# With it off (the dev default) or before a build, the source files are
+# linked and served as they are.
+#----------------------------------------------------------------------------#
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import abort, current_app, request, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+BUNDLES = {
+    'main.css': [
+        'css/bootstrap.min.css', 'css/layout.main.css', 'css/main.css',
+        'css/main.responsive.css', 'css/main.quickfix.css',
+    ],
+    'head.js': ['js/libs/modernizr-2.8.2.min.js', 'js/libs/moment.min.js'],
+    'body.js': ['js/libs/bootstrap-3.1.1.min.js', 'js/plugins.js', 'js/script.js'],
+}
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+COMPRESSIBLE = ('.css', '.js', '.map', '.json', '.svg', '.ttf', '.otf', '.eot', '.txt')
+ONE_YEAR = 365 * 24 * 60 * 60
+
+CSS_COMMENT = re.compile(r'/\*(?!!).*?\*/', re.S)
+CSS_SPACE = re.compile(r'\s+')
+CSS_PUNCTUATION = re.compile(r'\s*([{};,])\s*')
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+SOURCE_MAP = re.compile(r'^\s*(?://[#@]|/\*[#@]) sourceMappingURL=.*$', re.M)
+
+
+#----------------------------------------------------------------------------#
+# Build.
+#----------------------------------------------------------------------------#
+
+def minify_css(text):
+    # rcssmin when installed, otherwise comments and whitespace only;
+    # /*! license */ comments are kept either way.
+    try:
+        import rcssmin
+    except ImportError:
+        text = CSS_COMMENT.sub('', text)
+        return CSS_PUNCTUATION.sub(r'\1', CSS_SPACE.sub(' ', text)).strip()
+    return rcssmin.cssmin(text, keep_bang_comments=True)
+
+
+def minify_js(text):
+    # rjsmin when installed; most of the scripts are shipped minified anyway.
+    try:
+        import rjsmin
+    except ImportError:
+        return text.strip()
+    return rjsmin.jsmin(text, keep_bang_comments=True)
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return
+    yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+def hashed_name(path, content):
+    name, ext = posixpath.splitext(path)
+    return posixpath.join(DIST, '{}.{}{}'.format(name, hashlib.sha256(content).hexdigest()[:12], ext))
+
+
+def rewrite_urls(css, source, target, manifest):
+    # Relative url()s of a stylesheet moved from source to target, pointing
+    # at the hashed copies of the files they name.
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(('data:', '/', '#')) or '://' in url:
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+        resolved = manifest.get(resolved, resolved)
+        return 'url({0}{1}{2}{0})'.format(quote, posixpath.relpath(resolved, posixpath.dirname(target)), suffix)
+    return CSS_URL.sub(replace, css)
+
+
+def source_files(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        relative = os.path.relpath(root, static_folder).replace(os.sep, '/')
+        if relative == DIST or relative.startswith(DIST + '/'):
+            continue
+        for name in files:
+            if not name.startswith('.'):
+                yield posixpath.normpath(posixpath.join(relative, name))
+
+
+def bundle(static_folder, name, sources, manifest):
+    parts = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+            text = SOURCE_MAP.sub('', f.read())
+        if name.endswith('.css'):
+            parts.append(minify_css(rewrite_urls(text, source, posixpath.join(DIST, name), manifest)))
+        else:
+            parts.append(minify_js(text))
+    return ('\n' if name.endswith('.css') else '\n;\n').join(parts).encode('utf-8')
+
+
+def write_built(static_folder, path, content):
+    # Hashed names never change content, so files already built are kept:
+    # pages rendered before a deploy can still load the assets they name.
+    built = hashed_name(path, content)
+    target = os.path.join(static_folder, *built.split('/'))
+    if os.path.exists(target):
+        return built
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(content)
+    if built.endswith(COMPRESSIBLE):
+        for suffix, compress in compressors():
+            compressed = compress(content)
+            if len(compressed) < len(content):
+                with open(target + suffix, 'wb') as f:
+                    f.write(compressed)
+    return built
+
+
+def build(static_folder):
+    # Builds every file and bundle and returns the new manifest. Bundles are
+    # built last so their url()s can point at the hashed files.
+    manifest = {}
+    for path in sorted(source_files(static_folder)):
+        with open(os.path.join(static_folder, path), 'rb') as f:
+            manifest[path] = write_built(static_folder, path, f.read())
+    for name, sources in sorted(BUNDLES.items()):
+        manifest[name] = write_built(static_folder, name, bundle(static_folder, name, sources, manifest))
+
+    path = os.path.join(static_folder, DIST, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    return manifest
+
+
+#----------------------------------------------------------------------------#
+# Serving.
+#----------------------------------------------------------------------------#
+
+class AssetPipeline(object):
+    def __init__(self, app=None):
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASSETS_BUNDLED', False)
+        self.manifest = {}
+        if app.config['ASSETS_BUNDLED']:
+            path = os.path.join(app.static_folder, DIST, MANIFEST)
+            try:
+                with open(path) as f:
+                    self.manifest = json.load(f)
+            except FileNotFoundError:
+                app.logger.warning('ASSETS_BUNDLED is on but %s is missing, serving the source files; '
+                                   'run `flask assets build`', path)
+        app.url_defaults(self._hashed_filename)
+        app.add_template_global(self.asset_urls)
+        app.view_functions['static'] = self.send_static_file
+        app.extensions['assets'] = self
+
+    def _hashed_filename(self, endpoint, values):
+        if endpoint == 'static' and values.get('filename') in self.manifest:
+            values['filename'] = self.manifest[values['filename']]
+
+    def asset_urls(self, name):
+        # The built bundle, or its source files when there is no build.
+        if name in self.manifest:
+            return [url_for('static', filename=self.manifest[name])]
+        return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+    def send_static_file(self, filename):
+        if not filename.startswith(DIST + '/'):
+            return current_app.send_static_file(filename)
+        path = safe_join(current_app.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        encoding = None
+        if filename.endswith(COMPRESSIBLE):
+            for name, suffix in (('br', '.br'), ('gzip', '.gz')):
+                if request.accept_encodings[name] and os.path.isfile(path + suffix):
+                    encoding = name
+                    break
+        response = send_from_directory(
+            current_app.static_folder, filename + ('.br' if encoding == 'br' else '.gz' if encoding else ''),
+            mimetype=mimetypes.guess_type(filename)[0], max_age=ONE_YEAR
+        )
+        response.cache_control.immutable = True
+        if filename.endswith(COMPRESSIBLE):
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
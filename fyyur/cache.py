@@ -0,0 +1,256 @@
+#----------------------------------------------------------------------------#
+# Response cache for the read-heavy pages.
+#
+# Entries are keyed by route and arguments. Each cached view declares tags
+# ('venues', 'venue:3', ...) and the tag versions are folded into the key, so
+# a write handler invalidates exactly the pages it affects by bumping the
+# versions of their tags; stale entries are never read again and age out
+# through TTL and LRU eviction.
+#----------------------------------------------------------------------------#
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request, session, jsonify
+
+from fyyur.routing import pinned_to_primary
+
+
+class CacheStats(object):
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+class MemoryBackend(object):
+    # In-process LRU with per-entry TTL, bounded by entry count and by the
+    # total size of the cached bodies.
+    def __init__(self, stats, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.stats = stats
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, size, value = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, size=0):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (time.monotonic() + ttl, size, value)
+            self.size += size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.stats.evictions += 1
+
+    # Tag versions live outside the LRU: evicting one would reset it and
+    # make invalidated entries reachable again.
+    def version(self, tag):
+        return self.versions.get(tag, 0)
+
+    def bump(self, tag):
+        with self.lock:
+            self.versions[tag] = self.versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _remove(self, key):
+        self.size -= self.entries.pop(key)[1]
+
+
+class LocalSharedClient(object):
+    # Stand-in for the subset of the redis client API the shared backend uses,
+    # for development and tests without a redis server.
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        with self.lock:
+            value, expires = self.values.get(name, (None, None))
+            if expires is not None and expires < time.monotonic():
+                del self.values[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        with self.lock:
+            self.values[name] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, name):
+        with self.lock:
+            value = int(self.values.get(name, (0, None))[0]) + 1
+            self.values[name] = (value, None)
+            return value
+
+    def flushdb(self):
+        with self.lock:
+            self.values.clear()
+
+
+class SharedBackend(object):
+    # Cache shared between workers. Eviction and memory limits are left to the
+    # server: configure redis with maxmemory and volatile-lru, so that only
+    # page entries (which carry a TTL) are evicted and tag versions are kept.
+    def __init__(self, stats, client, prefix='fyyur:'):
+        self.stats = stats
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else pickle.loads(value)
+
+    def set(self, key, value, ttl, size=0):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def version(self, tag):
+        return int(self.client.get(self.prefix + 'tag:' + tag) or 0)
+
+    def bump(self, tag):
+        self.client.incr(self.prefix + 'tag:' + tag)
+
+    def clear(self):
+        self.client.flushdb()
+
+
+class ResponseCache(object):
+    def __init__(self, app=None):
+        self.stats = CacheStats()
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_DEFAULT_TTL', 60)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+        app.config.setdefault('CACHE_MAX_BYTES', 64 * 1024 * 1024)
+        app.config.setdefault('CACHE_MAX_STREAMED_BYTES', 1024 * 1024)
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+        backend = app.config['CACHE_BACKEND']
+        self.backend = None
+        if backend == 'memory':
+            self.backend = MemoryBackend(self.stats, app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_MAX_BYTES'])
+        elif backend == 'local':
+            self.backend = SharedBackend(self.stats, LocalSharedClient())
+        elif backend == 'redis':
+            import redis
+            self.backend = SharedBackend(self.stats, redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        elif backend != 'null':
+            raise ValueError('Unknown CACHE_BACKEND {!r}'.format(backend))
+        app.extensions['response_cache'] = self
+
+    def cached(self, tags, ttl=None):
+        # tags is called with the view arguments and returns the tags the
+        # page depends on. Only GET requests without pending flash messages,
+        # from clients not pinned to the primary after a write, are served
+        # from or stored in the cache.
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**view_args):
+                if self.backend is None or request.method != 'GET' or session.get('_flashes') \
+                        or pinned_to_primary():
+                    return view(**view_args)
+
+                key = self._key(tags(**view_args))
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self.stats.hits += 1
+                    body, status, headers = entry
+                    return current_app.response_class(body, status=status, headers=headers)
+
+                self.stats.misses += 1
+                response = make_response(view(**view_args))
+                if response.status_code == 200 and not session.get('_flashes'):
+                    headers = [('Content-Type', response.headers['Content-Type'])]
+                    entry_ttl = ttl or current_app.config['CACHE_DEFAULT_TTL']
+                    if response.is_streamed:
+                        response.response = self._tee(
+                            key, response.response, headers, entry_ttl,
+                            current_app.config['CACHE_MAX_STREAMED_BYTES']
+                        )
+                    else:
+                        body = response.get_data()
+                        self.backend.set(key, (body, response.status_code, headers), entry_ttl, len(body))
+                return response
+            return wrapper
+        return decorator
+
+    def _tee(self, key, chunks, headers, ttl, max_bytes):
+        # Passes a streamed body through and caches it once it has been sent
+        # in full, unless it grew past max_bytes on the way.
+        body = []
+        size = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                if body is not None:
+                    body.append(chunk)
+                    size += len(chunk)
+                    if size > max_bytes:
+                        body = None
+                yield chunk
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+        if body is not None:
+            self.backend.set(key, (b''.join(body), 200, headers), ttl, size)
+
+    def invalidate(self, *tags):
+        if self.backend is None:
+            return
+        for tag in set(tags):
+            self.backend.bump(tag)
+            self.stats.invalidations += 1
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def _key(self, tags):
+        versions = ','.join('{}={}'.format(tag, self.backend.version(tag)) for tag in sorted(tags))
+        query = '&'.join(sorted('{}={}'.format(k, v) for k, v in request.args.items(multi=True)))
+        return 'page:{}?{}|{}'.format(request.path, query, versions)
+
+    def stats_view(self):
+        data = self.stats.as_dict()
+        data['backend'] = current_app.config['CACHE_BACKEND']
+        if isinstance(self.backend, MemoryBackend):
+            data['entries'] = len(self.backend.entries)
+            data['bytes'] = self.backend.size
+        return jsonify(data)
@@ -0,0 +1,102 @@
+#----------------------------------------------------------------------------#
+# Deleting venues and artists.
+#
+# A delete first soft-deletes, in one short transaction: it sets deleted_at,
+# which every read query filters on, and cancels the entity's upcoming
+# shows, of which there are only ever a few. Its past shows can be any
+# number of rows; they stay, hidden, until the entity is purged, straight
+# away with DELETE_MODE 'hard' or by `flask purge-deleted` after
+# PURGE_AFTER_DAYS days with 'soft'. A purge deletes the shows
+# DELETE_CHUNK_SIZE rows per transaction, so no lock on Shows is held for
+# long, then the row itself. An interrupted purge is finished by the next
+# `flask purge-deleted`.
+#----------------------------------------------------------------------------#
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from fyyur.extensions import db, cache
+from fyyur.models import Shows, Venue, Artist, UpcomingByArea
+from fyyur.queries import counterpart_tags, live, refresh_counters, show_fk
+
+
+def soft_delete(model, entity_id):
+    # Returns the cache tags of the pages the entity was on, or None when
+    # there is no such live entity. The caller commits.
+    now = datetime.utcnow()
+    if not db.session.query(model).filter(model.id == entity_id, live(model)) \
+            .update({model.deleted_at: now}, synchronize_session=False):
+        return None
+    other = Artist if model is Venue else Venue
+    kind = 'venue' if model is Venue else 'artist'
+    tags = ['venues', 'artists', 'shows', 'upcoming', '{}:{}'.format(kind, entity_id)]
+    tags += counterpart_tags(model, entity_id)
+
+    other_ids = set(db.session.execute(
+        delete(Shows).where(show_fk(model) == entity_id, Shows.start_time > now).returning(show_fk(other)),
+        execution_options={'synchronize_session': False}
+    ).scalars())
+    if other_ids:
+        refresh_counters(other, other.id.in_(other_ids))
+    # The triggers, when installed, have already done this; the materialized
+    # view drops the shows on its next refresh.
+    area_fk = UpcomingByArea.venue_id if model is Venue else UpcomingByArea.artist_id
+    db.session.execute(delete(UpcomingByArea).where(area_fk == entity_id),
+                       execution_options={'synchronize_session': False})
+    return tags
+
+
+def purge(model, entity_id, chunk_size):
+    # Removes a soft-deleted entity and its remaining shows, committing after
+    # every chunk. Returns the number of shows deleted.
+    chunk = select(Shows.id).where(show_fk(model) == entity_id).limit(chunk_size)
+    purged = 0
+    while True:
+        deleted = db.session.execute(delete(Shows).where(Shows.id.in_(chunk)),
+                                     execution_options={'synchronize_session': False}).rowcount
+        db.session.commit()
+        purged += deleted
+        if deleted < chunk_size:
+            break
+    db.session.query(model).filter(model.id == entity_id, model.deleted_at.is_not(None)) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return purged
+
+
+def delete_entity(model, entity_id):
+    # Soft-deletes the entity and, in hard mode, purges it. Returns False when
+    # there is no such live entity.
+    tags = soft_delete(model, entity_id)
+    if tags is None:
+        db.session.rollback()
+        return False
+    db.session.commit()
+    cache.invalidate(*tags)
+    if current_app.config['DELETE_MODE'] == 'hard':
+        try:
+            purge(model, entity_id, current_app.config['DELETE_CHUNK_SIZE'])
+        except SQLAlchemyError:
+            # Already hidden; the purge job will finish it.
+            db.session.rollback()
+            current_app.logger.exception('Purging %s %s failed', model.__tablename__, entity_id)
+    return True
+
+
+def purge_deleted(days=None):
+    # Periodic job: purges the entities deleted more than `days` ago
+    # (PURGE_AFTER_DAYS by default, any age in hard mode, where rows are only
+    # left over from an interrupted purge). Yields (model, id, shows deleted).
+    config = current_app.config
+    if days is None:
+        days = 0 if config['DELETE_MODE'] == 'hard' else config['PURGE_AFTER_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    for model in (Venue, Artist):
+        # Read up front: purge() commits, which would end a streamed result.
+        entity_ids = [entity_id for (entity_id,) in db.session.query(model.id).filter(
+            model.deleted_at.is_not(None), model.deleted_at <= cutoff).order_by(model.deleted_at)]
+        for entity_id in entity_ids:
+            yield model, entity_id, purge(model, entity_id, config['DELETE_CHUNK_SIZE'])
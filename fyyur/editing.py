@@ -0,0 +1,95 @@
+#----------------------------------------------------------------------------#
+# Editing venues and artists.
+#
+# Edits are optimistic. The edit form carries the version of the row it was
+# rendered from, and the mapper's version_id_col makes the ORM flush
+#
+#   UPDATE "Venue" SET <changed columns>, version=? WHERE id=? AND version=?
+#
+# Only fields whose value differs from the row's are assigned, so unchanged
+# columns are not written and an edit that changes nothing writes nothing.
+# If the row was saved by someone else after the form was rendered, the
+# version no longer matches, either when the row is read or in the UPDATE's
+# WHERE clause (StaleDataError), and the edit is refused with EditConflict.
+#----------------------------------------------------------------------------#
+
+from sqlalchemy import update
+from sqlalchemy.orm.exc import StaleDataError
+
+from fyyur.extensions import db
+from fyyur.models import Venue, Artist, UpcomingByArea
+from fyyur.queries import counterpart_tags, get_live
+
+# Columns on the listing, search and browse pages.
+LISTED = {'name', 'city', 'state', 'genres'}
+# Columns on the show listings and the counterparts' pages.
+SHOWN_WITH_SHOWS = {'name', 'image_link'}
+# UpcomingByArea columns copied from each model.
+AREA_COLUMNS = {
+    Venue: {'name': 'venue_name', 'city': 'city', 'state': 'state'},
+    Artist: {'name': 'artist_name', 'image_link': 'artist_image_link'},
+}
+
+
+class EditConflict(Exception):
+    # current is the row as it is now, or None if it has been deleted since.
+    def __init__(self, current):
+        super(EditConflict, self).__init__('edited concurrently')
+        self.current = current
+
+
+def same(a, b):
+    # Empty strings and lists from the form match NULL columns.
+    return (a or None) == (b or None)
+
+
+def form_values(form):
+    return {name: field.data for name, field in form._fields.items() if name not in ('csrf_token', 'version')}
+
+
+def conflicting_fields(current, values):
+    # (field, saved value) for every field the other edit left different
+    # from this one.
+    return [(name, getattr(current, name)) for name, value in values.items()
+            if not same(getattr(current, name), value)]
+
+
+def apply_edit(model, entity_id, version, values):
+    # Writes the values that differ from the row, provided it is still at
+    # `version`. Returns the changed column names, or None when there is no
+    # such live entity. The caller commits.
+    entity = get_live(model, entity_id)
+    if entity is None:
+        return None
+    if entity.version != version:
+        raise EditConflict(entity)
+    changed = {name for name, value in values.items() if not same(getattr(entity, name), value)}
+    for name in changed:
+        setattr(entity, name, values[name])
+    try:
+        db.session.flush()
+    except StaleDataError:
+        db.session.rollback()
+        raise EditConflict(get_live(model, entity_id))
+
+    area_values = {column: values[name] for name, column in AREA_COLUMNS[model].items() if name in changed}
+    if area_values:
+        # The summary table copies these; the triggers, when installed, do
+        # the same.
+        area_fk = UpcomingByArea.venue_id if model is Venue else UpcomingByArea.artist_id
+        db.session.execute(update(UpcomingByArea).where(area_fk == entity_id).values(**area_values),
+                           execution_options={'synchronize_session': False})
+    return changed
+
+
+def edit_tags(model, entity_id, changed):
+    # Cache tags of the pages that show any of the changed columns.
+    kind = 'venue' if model is Venue else 'artist'
+    tags = ['{}:{}'.format(kind, entity_id)] if changed else []
+    if changed & LISTED:
+        tags.append(kind + 's')
+    if changed & SHOWN_WITH_SHOWS:
+        tags += ['shows', 'upcoming'] + counterpart_tags(model, entity_id)
+    if model is Venue and changed & {'city', 'state'}:
+        tags.append('upcoming')
+    return tags
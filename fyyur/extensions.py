@@ -0,0 +1,22 @@
+#----------------------------------------------------------------------------#
+# Extensions, bound to the application in create_app().
+#----------------------------------------------------------------------------#
+
+from flask_migrate import Migrate
+from flask_moment import Moment
+from flask_sqlalchemy import SQLAlchemy
+
+from fyyur.aio import AsyncDatabase
+from fyyur.assets import AssetPipeline
+from fyyur.cache import ResponseCache
+from fyyur.instrumentation import SQLInstrumentation
+from fyyur.routing import ReplicaRouter, RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+moment = Moment()
+cache = ResponseCache()
+instrumentation = SQLInstrumentation()
+replicas = ReplicaRouter()
+async_db = AsyncDatabase()
+assets = AssetPipeline()
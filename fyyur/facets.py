@@ -0,0 +1,219 @@
+#----------------------------------------------------------------------------#
+# Genre facets.
+#
+# Browsing venues or artists by genre, city/state and seeking flag, with the
+# number of matches per genre under the current filters. On Postgres the
+# genre filter is array containment on the GIN-indexed genres column (@> for
+# "all of", && for "any of") and the counts are one GROUP BY over
+# unnest(genres). Other databases use FacetIndex, an in-memory bitmap index
+# rebuilt when the entity's cache tag changes or after FACET_INDEX_MAX_AGE
+# seconds.
+#----------------------------------------------------------------------------#
+
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, true
+
+from fyyur.choices import genres_choices
+from fyyur.extensions import db, cache
+from fyyur.models import Venue, Artist
+from fyyur.queries import is_postgres, live
+
+GENRES = [value for value, label in genres_choices]
+TAGS = {Venue: 'venues', Artist: 'artists'}
+
+
+def seeking_column(model):
+    return model.seeking_talent if model is Venue else model.seeking_venue
+
+
+def parse_filters(args):
+    # ?genre=Jazz&genre=Blues&match=any&state=CA&city=San Francisco&seeking=1
+    return {
+        'genres': [genre for genre in args.getlist('genre') if genre in GENRES],
+        'match': 'any' if args.get('match') == 'any' else 'all',
+        'state': args.get('state') or None,
+        'city': (args.get('city') or '').strip() or None,
+        'seeking': args.get('seeking') in ('1', 'true', 'y'),
+    }
+
+
+def browse(model, filters, page=1):
+    per_page = current_app.config['SEARCH_PAGE_SIZE']
+    if is_postgres():
+        total, rows, counts = sql_browse(model, filters, (page - 1) * per_page, per_page)
+    else:
+        total, rows, counts = facet_index(model).browse(filters, (page - 1) * per_page, per_page)
+    return {
+        'count': total,
+        'page': page,
+        'has_next': page * per_page < total,
+        'data': [{
+            'id': row.id,
+            'name': row.name,
+            'num_upcoming_shows': row.num_upcoming_shows,
+        } for row in rows],
+        'facets': {
+            'genres': [{
+                'genre': genre,
+                'count': counts.get(genre, 0),
+                'selected': genre in filters['genres'],
+            } for genre in GENRES],
+        },
+    }
+
+
+def page_rows(model, ids):
+    # Listing columns of the given ids, in the order given.
+    rows = {row.id: row for row in db.session.query(
+        model.id, model.name, model.upcoming_shows_count.label('num_upcoming_shows')
+    ).filter(model.id.in_(ids))}
+    return [rows[entity_id] for entity_id in ids if entity_id in rows]
+
+
+#----------------------------------------------------------------------------#
+# Postgres.
+#----------------------------------------------------------------------------#
+
+def sql_criteria(model, filters, genres=True):
+    criteria = [live(model)]
+    if genres and filters['genres']:
+        if filters['match'] == 'any':
+            criteria.append(model.genres.overlap(filters['genres']))
+        else:
+            criteria.append(model.genres.contains(filters['genres']))
+    if filters['state']:
+        criteria.append(model.state == filters['state'])
+    if filters['city']:
+        criteria.append(func.lower(model.city) == filters['city'].lower())
+    if filters['seeking']:
+        criteria.append(seeking_column(model) == true())
+    return criteria
+
+
+def sql_browse(model, filters, offset, limit):
+    criteria = sql_criteria(model, filters)
+    rows = db.session.query(
+        model.id, model.name,
+        model.upcoming_shows_count.label('num_upcoming_shows'),
+        func.count().over().label('total')
+    ).filter(*criteria).order_by(model.name, model.id).limit(limit).offset(offset).all()
+    total = rows[0].total if rows else db.session.query(func.count(model.id)).filter(*criteria).scalar()
+
+    # With "any of", a genre's count is what selecting it alone would add,
+    # so it ignores the other selected genres.
+    genre = func.unnest(model.genres).column_valued('genre')
+    counted = criteria if filters['match'] == 'all' else sql_criteria(model, filters, genres=False)
+    counts = dict(db.session.query(genre, func.count()).select_from(model).filter(*counted).group_by(genre))
+    return total, rows, counts
+
+
+#----------------------------------------------------------------------------#
+# Bitmap index.
+#----------------------------------------------------------------------------#
+
+def make_bitmap(positions, size):
+    # Built in a bytearray; OR-ing bits into an int one by one is quadratic.
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def popcount(bitmap):
+    return bin(bitmap).count('1')
+
+
+class FacetIndex(object):
+    # One Python int per genre, state, city and seeking flag, with bit i set
+    # when the i-th row in (name, id) order has that value. Filters are ANDs
+    # and ORs of those ints, counts are popcounts, and a page is read off the
+    # set bits in order, so no step scans the rows themselves.
+    def __init__(self, model, rows, version):
+        self.model = model
+        self.version = version
+        self.built = time.monotonic()
+        self.ids = []
+        genres, states, cities, seeking = {}, {}, {}, []
+        for position, row in enumerate(rows):
+            self.ids.append(row.id)
+            for genre in row.genres or ():
+                genres.setdefault(genre, []).append(position)
+            states.setdefault(row.state, []).append(position)
+            cities.setdefault((row.city or '').lower(), []).append(position)
+            if row.seeking:
+                seeking.append(position)
+        size = len(self.ids)
+        self.genres = {key: make_bitmap(positions, size) for key, positions in genres.items()}
+        self.states = {key: make_bitmap(positions, size) for key, positions in states.items()}
+        self.cities = {key: make_bitmap(positions, size) for key, positions in cities.items()}
+        self.seeking = make_bitmap(seeking, size)
+        self.all = (1 << size) - 1
+
+    def match(self, filters, genres=True):
+        bitmap = self.all
+        if genres and filters['genres']:
+            selected = [self.genres.get(genre, 0) for genre in filters['genres']]
+            if filters['match'] == 'any':
+                combined = 0
+                for genre_bitmap in selected:
+                    combined |= genre_bitmap
+            else:
+                combined = self.all
+                for genre_bitmap in selected:
+                    combined &= genre_bitmap
+            bitmap &= combined
+        if filters['state']:
+            bitmap &= self.states.get(filters['state'], 0)
+        if filters['city']:
+            bitmap &= self.cities.get(filters['city'].lower(), 0)
+        if filters['seeking']:
+            bitmap &= self.seeking
+        return bitmap
+
+    def counts(self, bitmap):
+        return {genre: popcount(bitmap & genre_bitmap) for genre, genre_bitmap in self.genres.items()}
+
+    def positions(self, bitmap, offset, limit):
+        # Set bits offset..offset+limit, lowest first. bin() is read back to
+        # front so str.find walks the bits in C.
+        bits = bin(bitmap)[:1:-1]
+        positions = []
+        i = bits.find('1')
+        while i != -1 and len(positions) < offset + limit:
+            positions.append(i)
+            i = bits.find('1', i + 1)
+        return positions[offset:]
+
+    def browse(self, filters, offset, limit):
+        bitmap = self.match(filters)
+        counted = bitmap if filters['match'] == 'all' else self.match(filters, genres=False)
+        ids = [self.ids[position] for position in self.positions(bitmap, offset, limit)]
+        return popcount(bitmap), page_rows(self.model, ids), self.counts(counted)
+
+
+class FacetIndexes(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.indexes = {}
+
+    def get(self, model):
+        version = cache.backend.version(TAGS[model]) if cache.backend is not None else None
+        index = self.indexes.get(model)
+        max_age = current_app.config['FACET_INDEX_MAX_AGE']
+        if index is None or index.version != version or time.monotonic() - index.built > max_age:
+            with self.lock:
+                rows = db.session.query(
+                    model.id, model.genres, model.state, model.city, seeking_column(model).label('seeking')
+                ).filter(live(model)).order_by(model.name, model.id).yield_per(5000)
+                index = self.indexes[model] = FacetIndex(model, rows, version)
+        return index
+
+
+indexes = FacetIndexes()
+
+
+def facet_index(model):
+    return indexes.get(model)
@@ -0,0 +1,41 @@
+#----------------------------------------------------------------------------#
+# Filters.
+#----------------------------------------------------------------------------#
+#
+# babel and dateutil are imported on first use rather than at startup.
+
+from datetime import timezone
+from functools import lru_cache
+
+DATETIME_FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma",
+}
+
+
+@lru_cache(maxsize=None)
+def datetime_pattern(format, locale):
+    # Babel re-parses the pattern and the locale on every format_datetime call.
+    import babel
+    import babel.dates
+    return babel.dates.parse_pattern(format), babel.Locale.parse(locale)
+
+
+@lru_cache(maxsize=4096)
+def cached_format_datetime(value, format, locale):
+    pattern, locale = datetime_pattern(format, locale)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return pattern.apply(value, locale)
+
+
+def format_datetime(value, format='medium', locale=None):
+    # Accepts datetime objects as passed by the views; strings are still
+    # parsed for templates that hand over formatted values.
+    if isinstance(value, str):
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    if locale is None:
+        import babel.dates
+        locale = babel.dates.LC_TIME
+    return cached_format_datetime(value, DATETIME_FORMATS.get(format, format), locale)
@@ -0,0 +1,131 @@
+from datetime import datetime
+from flask_wtf import FlaskForm as Form
+from wtforms import Form as BaseForm, StringField, SelectField, SelectMultipleField, DateTimeField, IntegerField, \
+    BooleanField, FieldList, FormField
+from wtforms.validators import DataRequired, URL, Regexp, NumberRange, Optional
+from wtforms.widgets import HiddenInput
+
+from fyyur.choices import state_choices, genres_choices
+from fyyur.models import DEFAULT_SHOW_DURATION, MAX_SHOW_DURATION, MAX_TOUR_SHOWS
+
+class ShowForm(Form):
+    artist_id = StringField(
+        'artist_id'
+    )
+    venue_id = StringField(
+        'venue_id'
+    )
+    start_time = DateTimeField(
+        'start_time',
+        validators=[DataRequired()],
+        default= datetime.today()
+    )
+    duration = IntegerField(
+        'duration',
+        validators=[Optional(), NumberRange(min=1, max=MAX_SHOW_DURATION)],
+        default=DEFAULT_SHOW_DURATION
+    )
+
+class TourDateForm(BaseForm):
+    # One row of TourForm: the venue (or artist) of that date. Blank rows
+    # are ignored.
+    other_id = StringField(
+        'other_id'
+    )
+    start_time = DateTimeField(
+        'start_time',
+        validators=[Optional()]
+    )
+    duration = IntegerField(
+        'duration',
+        validators=[Optional(), NumberRange(min=1, max=MAX_SHOW_DURATION)]
+    )
+
+class TourForm(Form):
+    kind = SelectField(
+        'kind',
+        choices=[('artist', 'An artist playing several venues'), ('venue', 'A venue hosting several artists')],
+        default='artist'
+    )
+    fixed_id = StringField(
+        'fixed_id', validators=[DataRequired()]
+    )
+    dates = FieldList(
+        FormField(TourDateForm),
+        min_entries=6,
+        max_entries=MAX_TOUR_SHOWS
+    )
+    all_or_nothing = BooleanField(
+        'all_or_nothing',
+        default=True
+    )
+
+class VenueForm(Form):
+    name = StringField(
+        'name', validators=[DataRequired()]
+    )
+    city = StringField(
+        'city', validators=[DataRequired()]
+    )
+    state = SelectField(
+        'state', validators=[DataRequired()],
+        choices=state_choices
+    )
+    address = StringField(
+        'address', validators=[DataRequired()]
+    )
+    phone = StringField(
+        'phone', validators=[DataRequired(), Regexp(r"^[0-9 +\-]+$", message='Phone numbers can only contain numbers, + and -.')]
+    )
+    image_link = StringField(
+        'image_link'
+    )
+    genres = SelectMultipleField(
+        # TODO implement enum restriction
+        'genres', validators=[DataRequired()],
+        choices= genres_choices
+    )
+    facebook_link = StringField(
+        'facebook_link', validators=[URL()]
+    )
+
+class EditVenueForm(VenueForm):
+    # The version of the row the editor started from.
+    version = IntegerField(
+        'version', widget=HiddenInput(), validators=[DataRequired()]
+    )
+
+class ArtistForm(Form):
+    name = StringField(
+        'name', validators=[DataRequired()]
+    )
+    city = StringField(
+        'city', validators=[DataRequired()]
+    )
+    state = SelectField(
+        'state', validators=[DataRequired()],
+        choices= state_choices
+    )
+    phone = StringField(
+        # TODO implement validation logic for state
+        'phone', validators=[DataRequired(), Regexp(r"^[0-9 +\-]+$", message='Phone numbers can only contain numbers, + and -.')]
+    )
+    image_link = StringField(
+        'image_link'
+    )
+    genres = SelectMultipleField(
+        # TODO implement enum restriction
+        'genres', validators=[DataRequired()],
+        choices= genres_choices
+    )
+    facebook_link = StringField(
+        # TODO implement enum restriction
+        'facebook_link', validators=[URL()]
+    )
+
+# TODO IMPLEMENT NEW ARTIST FORM AND NEW SHOW FORM
+
+class EditArtistForm(ArtistForm):
+    version = IntegerField(
+        'version', widget=HiddenInput(), validators=[DataRequired()]
+    )
@@ -0,0 +1,237 @@
+#----------------------------------------------------------------------------#
+# Bulk import.
+#----------------------------------------------------------------------------#
+
+import csv
+import io
+import json
+
+import click
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.datastructures import MultiDict
+
+from fyyur.extensions import db, cache
+from fyyur.models import Shows, Venue, Artist
+from fyyur.queries import live
+from fyyur.scheduling import book_shows, booking_tags
+
+bp = Blueprint('importer', __name__, cli_group=None)
+
+
+# Forms are named rather than imported so wtforms loads only when an
+# import actually runs.
+IMPORTS = {
+    'venues': (Venue, 'VenueForm'),
+    'artists': (Artist, 'ArtistForm'),
+    'shows': (Shows, 'ShowForm'),
+}
+
+
+def read_rows(stream, format):
+    # Yields one dict per CSV record or NDJSON line, or the ValueError of a
+    # line that is not a JSON object. CSV genres are comma separated.
+    if format == 'csv':
+        for row in csv.DictReader(stream):
+            if row.get('genres'):
+                row['genres'] = [genre.strip() for genre in row['genres'].split(',') if genre.strip()]
+            yield row
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield error
+                continue
+            if not isinstance(row, dict):
+                yield ValueError('Not a JSON object: {}'.format(line.strip()[:80]))
+                continue
+            yield row
+
+
+def validate_row(form_class, row):
+    # Runs the row through the same form the create pages use.
+    formdata = MultiDict()
+    for key, value in row.items():
+        if isinstance(value, list):
+            formdata.setlist(key, [str(item) for item in value])
+        elif value is not None:
+            formdata.add(key, str(value))
+    form = form_class(formdata=formdata, meta={'csrf': False})
+    if not form.validate():
+        return None, form.errors
+    # Empty optional fields (a show's duration) take the form's default.
+    return {name: field.default if field.data is None and field.default is not None else field.data
+            for name, field in form._fields.items() if name != 'csrf_token'}, None
+
+
+def resolve_show_references(chunk, report):
+    # Shows may reference venues and artists by id or by name. All ids and
+    # names of the chunk are resolved with one IN query per entity.
+    resolved = {}
+    for model, key in ((Venue, 'venue'), (Artist, 'artist')):
+        ids = {int(values[key + '_id']) for line, values, row in chunk if str(values[key + '_id']).isdigit()}
+        names = {row.get(key + '_name') for line, values, row in chunk if not values[key + '_id'] and row.get(key + '_name')}
+        found = db.session.query(model.id, model.name).filter(
+            or_(model.id.in_(ids), model.name.in_(names)), live(model)).all()
+        by_name = {}
+        for entity_id, name in found:
+            by_name.setdefault(name, []).append(entity_id)
+        resolved[key] = ({entity_id for entity_id, name in found}, by_name)
+
+    rows = []
+    for line, values, row in chunk:
+        errors = {}
+        for key in ('venue', 'artist'):
+            known_ids, by_name = resolved[key]
+            reference = values[key + '_id']
+            if reference:
+                if not str(reference).isdigit() or int(reference) not in known_ids:
+                    errors[key + '_id'] = ['There is no {} with id {}.'.format(key, reference)]
+                else:
+                    values[key + '_id'] = int(reference)
+            else:
+                matches = by_name.get(row.get(key + '_name'), [])
+                if len(matches) == 1:
+                    values[key + '_id'] = matches[0]
+                else:
+                    errors[key + '_name'] = ['{} {} {!r}.'.format(
+                        'Ambiguous' if matches else 'Unknown', key, row.get(key + '_name'))]
+        if errors:
+            report['errors'].append({'row': line, 'errors': errors})
+        else:
+            rows.append((line, values))
+    return rows
+
+
+def insert_chunk(model, chunk, report):
+    # One executemany per chunk. If the database rejects the batch, the chunk
+    # is retried row by row so only the offending rows are reported.
+    table = model.__table__
+    try:
+        db.session.execute(table.insert(), [values for line, values in chunk])
+        db.session.commit()
+        return [values for line, values in chunk]
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    inserted = []
+    for line, values in chunk:
+        try:
+            db.session.execute(table.insert(), [values])
+            db.session.commit()
+            inserted.append(values)
+        except SQLAlchemyError as error:
+            db.session.rollback()
+            report['errors'].append({'row': line, 'errors': {'database': [str(getattr(error, 'orig', error))]}})
+    return inserted
+
+
+def book_chunk(chunk, report):
+    # Shows are booked like on the tour page, so a row that clashes with an
+    # existing show or with another row is reported against its line and
+    # the rest of the chunk is booked with one INSERT. If the database still
+    # rejects the chunk (a booking committed meanwhile, twice over), it is
+    # retried row by row. Returns the results of the booked rows.
+    try:
+        results = book_shows([dict(values, row=line) for line, values in chunk], all_or_nothing=False)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        results = []
+        for line, values in chunk:
+            try:
+                result, = book_shows([dict(values, row=line)])
+                db.session.commit()
+            except SQLAlchemyError as error:
+                db.session.rollback()
+                result = {'status': 'rejected', 'errors': [str(getattr(error, 'orig', error))]}
+            results.append(result)
+
+    booked = []
+    for (line, values), result in zip(chunk, results):
+        if result['status'] == 'booked':
+            booked.append(result)
+        else:
+            report['errors'].append({'row': line, 'errors': {'booking': result['errors']}})
+    return booked
+
+
+def import_rows(kind, stream, format, chunk_size=None):
+    from fyyur import forms
+    model, form_name = IMPORTS[kind]
+    form_class = getattr(forms, form_name)
+    chunk_size = chunk_size or current_app.config['IMPORT_CHUNK_SIZE']
+    report = {'inserted': 0, 'failed': 0, 'errors': []}
+    stale_tags = {kind}
+
+    def flush(chunk):
+        if kind == 'shows':
+            rows = resolve_show_references(chunk, report)
+            booked = book_chunk(rows, report) if rows else []
+            report['inserted'] += len(booked)
+            if booked:
+                stale_tags.update(booking_tags(booked))
+        else:
+            rows = [(line, values) for line, values, row in chunk]
+            report['inserted'] += len(insert_chunk(model, rows, report))
+
+    chunk = []
+    for line, row in enumerate(read_rows(stream, format), 1):
+        if isinstance(row, ValueError):
+            report['errors'].append({'row': line, 'errors': {'row': [str(row)]}})
+            continue
+        values, errors = validate_row(form_class, row)
+        if errors:
+            report['errors'].append({'row': line, 'errors': errors})
+            continue
+        chunk.append((line, values, row))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    cache.invalidate(*stale_tags)
+    report['failed'] = len(report['errors'])
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+
+def import_format(filename, format=None):
+    if format:
+        return format
+    return 'csv' if filename.lower().endswith('.csv') else 'ndjson'
+
+
+@bp.route('/import/<kind>', methods=['POST'])
+def import_upload(kind):
+    # multipart upload with a 'file' field; ?format= overrides the extension.
+    if kind not in IMPORTS or 'file' not in request.files:
+        abort(400)
+    upload = request.files['file']
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+    report = import_rows(
+        kind, stream, import_format(upload.filename, request.args.get('format')),
+        request.args.get('chunk_size', type=int)
+    )
+    return jsonify(report)
+
+
+@bp.cli.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORTS)))
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension.')
+@click.option('--chunk-size', type=int, help='Rows per INSERT transaction.')
+@click.option('--report', type=click.File('w'), help='Write the per-row error report as JSON.')
+def import_command(kind, source, format, chunk_size, report):
+    result = import_rows(kind, source, import_format(source.name, format), chunk_size)
+    click.echo('{} inserted, {} failed'.format(result['inserted'], result['failed']))
+    if report:
+        json.dump(result['errors'], report, indent=2)
+    else:
+        for error in result['errors']:
+            click.echo('row {}: {}'.format(error['row'], error['errors']))
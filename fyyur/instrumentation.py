@@ -0,0 +1,168 @@
+#----------------------------------------------------------------------------#
+# Per-request SQL instrumentation.
+#
+# Engine events count every statement a request issues and time it. Each
+# response gets a Server-Timing header, statements slower than
+# SQL_SLOW_QUERY_MS are logged, and a statement shape repeated more than
+# SQL_N_PLUS_ONE_THRESHOLD times in one request is flagged as a likely N+1.
+# Per-endpoint aggregates, plus the top functions of sampled cProfile runs,
+# are served by the admin view.
+#----------------------------------------------------------------------------#
+
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from functools import partial
+
+from flask import current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    # Literal values and expanded IN lists are folded so that the same query
+    # issued for different rows has the same shape.
+    shape = LITERALS.sub('?', statement)
+    shape = PLACEHOLDER_LISTS.sub('(?)', shape)
+    return WHITESPACE.sub(' ', shape).strip()
+
+
+class EndpointStats(object):
+    def __init__(self, slowest_kept):
+        self.requests = 0
+        self.queries = 0
+        self.db_ms = 0.0
+        self.max_queries = 0
+        self.n_plus_one = Counter()
+        self.slowest = []
+        self.slowest_kept = slowest_kept
+
+    def add(self, queries, db_ms, slowest, n_plus_one):
+        self.requests += 1
+        self.queries += queries
+        self.db_ms += db_ms
+        self.max_queries = max(self.max_queries, queries)
+        self.n_plus_one.update(n_plus_one)
+        self.slowest = sorted(self.slowest + slowest, reverse=True)[:self.slowest_kept]
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'avg_queries': self.queries / self.requests,
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.db_ms / self.requests, 3),
+            'n_plus_one': dict(self.n_plus_one),
+            'slowest': [{'ms': round(ms, 3), 'statement': statement} for ms, statement in self.slowest],
+        }
+
+
+class SQLInstrumentation(object):
+    def __init__(self, app=None):
+        self.endpoints = {}
+        self.profiles = deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SQL_INSTRUMENTATION', True)
+        app.config.setdefault('SQL_SLOW_QUERY_MS', 100)
+        app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', 10)
+        app.config.setdefault('SQL_SLOWEST_KEPT', 5)
+        app.config.setdefault('PROFILER_SAMPLE_RATE', 0.0)
+        app.extensions['sql_instrumentation'] = self
+        if not app.config['SQL_INSTRUMENTATION']:
+            return
+
+        if not self.listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self.listening = True
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        g.sql_started = time.perf_counter()
+        g.sql_queries = []
+        g.sql_profiler = None
+        if random.random() < current_app.config['PROFILER_SAMPLE_RATE']:
+            import cProfile
+            g.sql_profiler = cProfile.Profile()
+            g.sql_profiler.enable()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'sql_queries' in g:
+            context._sql_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_sql_started', None)
+        if started is None or not has_request_context() or 'sql_queries' not in g:
+            return
+        ms = (time.perf_counter() - started) * 1000
+        g.sql_queries.append((ms, statement))
+        if ms > current_app.config['SQL_SLOW_QUERY_MS']:
+            current_app.logger.warning('Slow query (%.1f ms) in %s: %s', ms, request.endpoint, statement)
+
+    def _after_request(self, response):
+        if 'sql_queries' not in g:
+            return response
+        finish = partial(self._finish, current_app._get_current_object(), request.endpoint, request.full_path,
+                         g.sql_queries, g.sql_started, g.sql_profiler)
+        if response.is_streamed:
+            # A streamed body, and the queries behind it, runs after this
+            # hook, so the request is recorded once the body has been sent.
+            # The headers are gone by then: no Server-Timing.
+            response.call_on_close(finish)
+            return response
+
+        db_ms, queries, total_ms = finish()
+        response.headers.add('Server-Timing', 'db;dur={:.2f};desc="{} queries"'.format(db_ms, queries))
+        response.headers.add('Server-Timing', 'app;dur={:.2f}'.format(total_ms))
+        return response
+
+    def _finish(self, app, endpoint, path, queries, started, profiler):
+        # Records a finished request; returns (db ms, queries, total ms).
+        if profiler is not None:
+            profiler.disable()
+            self._record_profile(profiler, endpoint, path)
+
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = sum(ms for ms, statement in queries)
+        shapes = Counter(statement_shape(statement) for ms, statement in queries)
+        threshold = app.config['SQL_N_PLUS_ONE_THRESHOLD']
+        n_plus_one = {shape: count for shape, count in shapes.items() if count > threshold}
+        for shape, count in n_plus_one.items():
+            app.logger.warning('Possible N+1 in %s: %d x %s', endpoint, count, shape)
+
+        kept = app.config['SQL_SLOWEST_KEPT']
+        slowest = sorted(queries, reverse=True)[:kept]
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint or '<unmatched>', EndpointStats(kept))
+            stats.add(len(queries), db_ms, slowest, n_plus_one)
+        return db_ms, len(queries), total_ms
+
+    def _record_profile(self, profiler, endpoint, path):
+        import pstats
+        stats = pstats.Stats(profiler)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:15]
+        self.profiles.append({
+            'endpoint': endpoint,
+            'path': path,
+            'functions': [{
+                'function': '{}:{}({})'.format(*function),
+                'calls': calls,
+                'cumulative_ms': round(cumulative * 1000, 3),
+            } for function, (primitive, calls, total, cumulative, callers) in top],
+        })
+
+    def stats_view(self):
+        with self.lock:
+            endpoints = {endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()}
+        return jsonify({'endpoints': endpoints, 'profiles': list(self.profiles)})
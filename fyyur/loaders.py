@@ -0,0 +1,71 @@
+#----------------------------------------------------------------------------#
+# Request-scoped entity loader.
+#
+# entity_loader() is the current request's EntityLoader. prime(model, ids)
+# queues ids; the first get() or get_many() of a model fetches every id
+# queued for it so far with one IN query. Instances already in the session's
+# identity map are used without a query, and results (misses included) are
+# kept for the rest of the request, until the session's transaction ends and
+# its instances expire. Soft-deleted rows resolve to None.
+#----------------------------------------------------------------------------#
+
+from flask import g, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm.util import identity_key
+
+from fyyur.extensions import db
+from fyyur.routing import RoutingSession
+
+# Ids per IN query, well under SQLite's bound parameter limit.
+BATCH_SIZE = 500
+
+
+class EntityLoader(object):
+    def __init__(self):
+        self.loaded = {}
+        self.pending = {}
+
+    def prime(self, model, ids):
+        pending = self.pending.setdefault(model, set())
+        pending.update(entity_id for entity_id in ids if (model, entity_id) not in self.loaded)
+
+    def get(self, model, entity_id):
+        if (model, entity_id) not in self.loaded:
+            self.prime(model, (entity_id,))
+            self.dispatch(model)
+        return self.loaded[(model, entity_id)]
+
+    def get_many(self, model, ids):
+        ids = list(ids)
+        self.prime(model, ids)
+        self.dispatch(model)
+        return {entity_id: self.loaded[(model, entity_id)] for entity_id in ids}
+
+    def dispatch(self, model):
+        missing = []
+        for entity_id in self.pending.pop(model, ()):
+            instance = db.session.identity_map.get(identity_key(model, entity_id))
+            if instance is not None and not inspect(instance).expired_attributes:
+                self.loaded[(model, entity_id)] = instance if instance.deleted_at is None else None
+            else:
+                missing.append(entity_id)
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            found = {entity.id: entity for entity in
+                     db.session.query(model).filter(model.id.in_(batch), model.deleted_at.is_(None))}
+            for entity_id in batch:
+                self.loaded[(model, entity_id)] = found.get(entity_id)
+
+
+def entity_loader():
+    if 'entity_loader' not in g:
+        g.entity_loader = EntityLoader()
+    return g.entity_loader
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def forget_loaded(session, transaction):
+    # Commit, rollback and close expire or detach what was loaded.
+    if transaction.parent is None and has_app_context():
+        g.pop('entity_loader', None)
+
@@ -0,0 +1,143 @@
+#----------------------------------------------------------------------------#
+# Models.
+#----------------------------------------------------------------------------#
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, JSON, String, Integer, Boolean, Index, Date, DateTime, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, ExcludeConstraint
+
+from fyyur.extensions import db
+
+# Postgres stores genres as a native array (the dialect's ARRAY, which has
+# the @> and && operators); SQLite (used for local testing) falls back to a
+# JSON list.
+Genres = ARRAY(String).with_variant(JSON(), 'sqlite')
+
+# Show durations in minutes.
+DEFAULT_SHOW_DURATION = 120
+MAX_SHOW_DURATION = 24 * 60
+
+# Most shows one tour booking may hold.
+MAX_TOUR_SHOWS = 50
+
+# Venues and artists are soft-deleted first (see fyyur/deletion.py). Reads
+# only ever ask for live rows, so their indexes only cover those; the purge
+# job finds deleted ones through ix_<table>_deleted_at.
+LIVE = text('deleted_at IS NULL')
+DELETED = text('deleted_at IS NOT NULL')
+
+
+def default_end_time(context):
+    # Lets ORM adds, the importer's executemany and the seeders leave
+    # end_time out.
+    params = context.get_current_parameters()
+    return params['start_time'] + timedelta(minutes=params.get('duration') or DEFAULT_SHOW_DURATION)
+
+
+class Shows(db.Model):
+    __tablename__ = 'Shows'
+    __table_args__ = (
+        Index('ix_Shows_start_time_id', 'start_time', 'id'),
+        Index('ix_Shows_venue_id_start_time', 'venue_id', 'start_time'),
+        Index('ix_Shows_artist_id_start_time', 'artist_id', 'start_time'),
+    )
+    id = Column(Integer, primary_key=True)
+    venue_id = Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+    artist_id = Column(db.Integer, db.ForeignKey('Artist.id'), nullable=False)
+    start_time = Column(db.DateTime, default=datetime.utcnow())
+    # Minutes; end_time is start_time + duration.
+    duration = Column(Integer, nullable=False, default=DEFAULT_SHOW_DURATION, server_default=str(DEFAULT_SHOW_DURATION))
+    end_time = Column(DateTime, nullable=False, default=default_end_time)
+
+
+# No two shows of a venue, or of an artist, may overlap (Postgres only; needs
+# btree_gist for the integer column).
+for column in ('venue_id', 'artist_id'):
+    Shows.__table__.append_constraint(ExcludeConstraint(
+        (Shows.__table__.c[column], '='),
+        (func.tsrange(Shows.start_time, Shows.end_time), '&&'),
+        name='ex_Shows_{}_period'.format(column), using='gist',
+    ).ddl_if(dialect='postgresql'))
+
+
+class Venue(db.Model):
+    __tablename__ = 'Venue'
+    __table_args__ = (
+        Index('ix_Venue_name_trgm', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_where=LIVE, sqlite_where=LIVE),
+        Index('ix_Venue_state_city', 'state', 'city', postgresql_where=LIVE, sqlite_where=LIVE),
+        Index('ix_Venue_genres', 'genres', postgresql_using='gin', postgresql_where=LIVE, sqlite_where=LIVE),
+        Index('ix_Venue_deleted_at', 'deleted_at', postgresql_where=DELETED, sqlite_where=DELETED),
+    )
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    city = Column(String(120))
+    state = Column(String(120))
+    address = Column(String(120))
+    phone = Column(String(120))
+    image_link = Column(String(500))
+    facebook_link = Column(String(120))
+    genres = db.Column(Genres, nullable = False)
+    website = Column(String(500))
+    seeking_talent = Column(Boolean(), default=False)
+    seeking_description = Column(String(1000))
+    upcoming_shows_count = Column(Integer, nullable=False, default=0, server_default='0')
+    next_show_time = Column(DateTime)
+    deleted_at = Column(DateTime)
+    # Checked and bumped by every ORM UPDATE of the row, so concurrent edits
+    # are detected (see fyyur/editing.py).
+    version = Column(Integer, nullable=False, server_default='1')
+    shows = db.relationship('Shows', backref='Venue', lazy=True)
+    __mapper_args__ = {'version_id_col': version}
+
+
+class Artist(db.Model):
+    __tablename__ = 'Artist'
+    __table_args__ = (
+        Index('ix_Artist_name_trgm', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_where=LIVE, sqlite_where=LIVE),
+        Index('ix_Artist_state_city', 'state', 'city', postgresql_where=LIVE, sqlite_where=LIVE),
+        Index('ix_Artist_genres', 'genres', postgresql_using='gin', postgresql_where=LIVE, sqlite_where=LIVE),
+        Index('ix_Artist_deleted_at', 'deleted_at', postgresql_where=DELETED, sqlite_where=DELETED),
+    )
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    city = Column(String(120))
+    state = Column(String(120))
+    phone = Column(String(120))
+    genres = db.Column(Genres, nullable = False)
+    image_link = Column(String(2000))
+    facebook_link = Column(String(120))
+    website = Column(String(500))
+    seeking_venue = Column(Boolean(), default=False)
+    seeking_description = Column(String(1000))
+    upcoming_shows_count = Column(Integer, nullable=False, default=0, server_default='0')
+    next_show_time = Column(DateTime)
+    deleted_at = Column(DateTime)
+    version = Column(Integer, nullable=False, server_default='1')
+    shows = db.relationship('Shows', backref='Artist', lazy=True)
+    __mapper_args__ = {'version_id_col': version}
+
+
+class UpcomingByArea(db.Model):
+    # Upcoming shows with their venue and artist denormalised, read by area
+    # and day. A summary table, rebuilt by `flask upcoming-area refresh` or
+    # kept current by triggers (see fyyur/areas.py); on Postgres the
+    # UpcomingByAreaView materialized view has the same columns.
+    __tablename__ = 'UpcomingByArea'
+    __table_args__ = (
+        Index('ix_UpcomingByArea_state_city_start_time', 'state', 'city', 'start_time'),
+        Index('ix_UpcomingByArea_venue_id', 'venue_id'),
+        Index('ix_UpcomingByArea_artist_id', 'artist_id'),
+    )
+    show_id = Column(Integer, primary_key=True, autoincrement=False)
+    state = Column(String(120))
+    city = Column(String(120))
+    day = Column(Date)
+    start_time = Column(DateTime)
+    venue_id = Column(Integer, nullable=False)
+    venue_name = Column(String)
+    artist_id = Column(Integer, nullable=False)
+    artist_name = Column(String)
+    artist_image_link = Column(String(2000))
@@ -0,0 +1,313 @@
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+import asyncio
+from datetime import datetime
+from itertools import groupby
+
+from flask import current_app, g
+from sqlalchemy import String, func, or_, and_, case, cast, tuple_, select
+
+from fyyur.choices import genres_choices
+from fyyur.extensions import db, async_db
+from fyyur.loaders import entity_loader
+from fyyur.models import Shows, Venue, Artist
+
+
+def venue_areas():
+    # Ordered so that each city/state area comes out contiguous and can be
+    # streamed to the template; upcoming show counts are the maintained
+    # counters on Venue.
+    rows = db.session.query(
+        Venue.state, Venue.city, Venue.id, Venue.name,
+        Venue.upcoming_shows_count.label('num_upcoming_shows')
+    ).filter(live(Venue)).order_by(Venue.state, Venue.city, Venue.name, Venue.id).yield_per(1000)
+
+    for (state, city), area_rows in groupby(rows, key=lambda row: (row.state, row.city)):
+        yield {
+            'city': city,
+            'state': state,
+            'venues': [{
+                'id': row.id,
+                'name': row.name,
+                'num_upcoming_shows': row.num_upcoming_shows,
+            } for row in area_rows]
+        }
+
+
+def show_entry(counterpart, other, start_time):
+    prefix = counterpart.lower()
+    return {
+        prefix + '_id': other.id,
+        prefix + '_name': other.name,
+        prefix + '_image_link': other.image_link,
+        'start_time': start_time,
+    }
+
+
+def load_detail(model, entity_id, counterpart):
+    # counterpart is the side to describe on each show, 'Artist' on a venue
+    # page and 'Venue' on an artist page. The entity and the counterparts go
+    # through the request's entity loader, so each distinct counterpart is
+    # read once (in one IN query for all of them) however many shows it has;
+    # past shows of a deleted counterpart resolve to None and are left out.
+    loader = entity_loader()
+    entity = loader.get(model, entity_id)
+    if entity is None:
+        return None, [], []
+    other = Artist if counterpart == 'Artist' else Venue
+    rows = db.session.query(Shows.start_time, show_fk(other)) \
+        .filter(show_fk(model) == entity_id).order_by(Shows.start_time, Shows.id).all()
+    others = loader.get_many(other, {other_id for start_time, other_id in rows})
+    now = datetime.utcnow()
+    past_shows = []
+    upcoming_shows = []
+    for start_time, other_id in rows:
+        if others[other_id] is None:
+            continue
+        entry = show_entry(counterpart, others[other_id], start_time)
+        if start_time > now:
+            upcoming_shows.append(entry)
+        else:
+            past_shows.append(entry)
+    return entity, past_shows, upcoming_shows
+
+
+def read_replica():
+    # Bind key of the replica this request reads from, or None for the
+    # primary; the async path follows the same choice as the sync session.
+    router = current_app.extensions.get('replica_router')
+    if router is not None and router.replica_engine(db.engines) is not None:
+        return g.db_replica
+    return None
+
+
+async def detail_async(model, entity_id, counterpart, replica=None):
+    # The entity, its past shows and its upcoming shows as three concurrent
+    # statements, each on its own pooled connection.
+    other = Artist if counterpart == 'Artist' else Venue
+    now = datetime.utcnow()
+    shows = select(Shows.start_time, other.id, other.name, other.image_link) \
+        .join(other, show_fk(other) == other.id) \
+        .where(show_fk(model) == entity_id, live(other)) \
+        .order_by(Shows.start_time, Shows.id)
+    entity, past_rows, upcoming_rows = await asyncio.gather(
+        async_db.scalar(select(model).where(model.id == entity_id, live(model)), replica),
+        async_db.all(shows.where(Shows.start_time <= now), replica),
+        async_db.all(shows.where(Shows.start_time > now), replica),
+    )
+    past_shows = [show_entry(counterpart, row, row.start_time) for row in past_rows]
+    upcoming_shows = [show_entry(counterpart, row, row.start_time) for row in upcoming_rows]
+    return entity, past_shows, upcoming_shows
+
+
+def venue_detail(venue_id):
+    if current_app.config['ASYNC_DETAIL_PAGES']:
+        venue, aux_past_shows, aux_future_shows = async_db.run(detail_async(Venue, venue_id, 'Artist', read_replica()))
+    else:
+        venue, aux_past_shows, aux_future_shows = load_detail(Venue, venue_id, 'Artist')
+    if not venue:
+        return None
+    return {
+        "id": venue.id,
+        "name": venue.name,
+        "genres": venue.genres,
+        "address": venue.address,
+        "city": venue.city,
+        "state": venue.state,
+        "phone": venue.phone,
+        "website": venue.website,
+        "facebook_link": venue.facebook_link,
+        "seeking_talent": venue.seeking_talent if venue.seeking_talent else False,
+        "seeking_description": venue.seeking_description,
+        "image_link": venue.image_link,
+        "past_shows": aux_past_shows,
+        "upcoming_shows": aux_future_shows,
+        "past_shows_count": len(aux_past_shows),
+        "upcoming_shows_count": len(aux_future_shows),
+    }
+
+
+def artist_detail(artist_id):
+    if current_app.config['ASYNC_DETAIL_PAGES']:
+        artist, aux_past_shows, aux_future_shows = async_db.run(detail_async(Artist, artist_id, 'Venue', read_replica()))
+    else:
+        artist, aux_past_shows, aux_future_shows = load_detail(Artist, artist_id, 'Venue')
+    if not artist:
+        return None
+    return {
+        "id": artist.id,
+        "name": artist.name,
+        "genres": artist.genres,
+        "city": artist.city,
+        "state": artist.state,
+        "phone": artist.phone,
+        "website": artist.website,
+        "facebook_link": artist.facebook_link,
+        "seeking_venue": artist.seeking_venue if artist.seeking_venue else False,
+        "seeking_description": artist.seeking_description,
+        "image_link": artist.image_link,
+        "past_shows": aux_past_shows,
+        "upcoming_shows": aux_future_shows,
+        "past_shows_count": len(aux_past_shows),
+        "upcoming_shows_count": len(aux_future_shows),
+    }
+
+
+def iter_artists():
+    rows = db.session.query(Artist.id, Artist.name).filter(live(Artist)).order_by(Artist.id).yield_per(1000)
+    for row in rows:
+        yield {'id': row.id, 'name': row.name}
+
+
+def artist_list():
+    return list(iter_artists())
+
+
+def show_fk(model):
+    return Shows.venue_id if model is Venue else Shows.artist_id
+
+
+def live(model):
+    # Not soft-deleted; matches the predicate of the partial indexes.
+    return model.deleted_at.is_(None)
+
+
+def get_live(model, entity_id):
+    return db.session.query(model).filter(model.id == entity_id, live(model)).first()
+
+
+def refresh_counters(model, *criteria):
+    # Recomputes the counters of the matching rows from Shows.
+    now = datetime.utcnow()
+    upcoming = and_(show_fk(model) == model.id, Shows.start_time > now)
+    return db.session.query(model).filter(*criteria).update({
+        model.upcoming_shows_count: select(func.count(Shows.id)).where(upcoming).scalar_subquery(),
+        model.next_show_time: select(func.min(Shows.start_time)).where(upcoming).scalar_subquery(),
+    }, synchronize_session=False)
+
+
+def counterpart_tags(model, entity_id):
+    # Cache tags of the detail pages that list shows of the given entity.
+    if model is Venue:
+        other, other_fk = 'artist', Shows.artist_id
+    else:
+        other, other_fk = 'venue', Shows.venue_id
+    return ['{}:{}'.format(other, other_id) for (other_id,) in
+            db.session.query(other_fk).filter(show_fk(model) == entity_id).distinct()]
+
+
+def is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def genre_match(model, genre):
+    if is_postgres():
+        return model.genres.contains([genre])
+    return cast(model.genres, String).like('%"' + genre + '"%')
+
+
+def search_entities(model, search_term, page=1):
+    # Name, "City, ST" and genre search with ranking, paging and total count
+    # in a single statement. On Postgres the name match is served by
+    # the pg_trgm GIN index, genres by the array GIN index.
+    per_page = current_app.config['SEARCH_PAGE_SIZE']
+    term = search_term.strip()
+    pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    criteria = [model.name.ilike(pattern, escape='\\')]
+
+    if ',' in term:
+        city, state = [part.strip() for part in term.rsplit(',', 1)]
+        criteria.append(and_(func.lower(model.city) == city.lower(), model.state == state.upper()))
+    genre = {value.lower(): value for value, label in genres_choices}.get(term.lower())
+    if genre:
+        criteria.append(genre_match(model, genre))
+
+    if is_postgres():
+        rank = [func.similarity(model.name, term).desc()]
+    else:
+        rank = [case(
+            (func.lower(model.name) == term.lower(), 0),
+            (model.name.ilike(pattern[1:], escape='\\'), 1),
+            else_=2
+        )]
+
+    rows = db.session.query(
+        model.id, model.name,
+        model.upcoming_shows_count.label('num_upcoming_shows'),
+        func.count().over().label('total')
+    ).filter(or_(*criteria), live(model)).order_by(*rank).order_by(model.name, model.id).limit(per_page).offset(
+        (page - 1) * per_page
+    ).all()
+
+    total = rows[0].total if rows else 0
+    return {
+        "count": total,
+        "page": page,
+        "has_next": page * per_page < total,
+        "data": [{
+            'id': row.id,
+            'name': row.name,
+            'num_upcoming_shows': row.num_upcoming_shows,
+        } for row in rows]
+    }
+
+
+def encode_show_cursor(row):
+    return '{}_{}'.format(row.start_time.isoformat(), row.id)
+
+
+def decode_show_cursor(cursor):
+    start_time, show_id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(start_time), int(show_id)
+
+
+class ShowPage(object):
+    # One page of the show listing, read as it is iterated so a streamed
+    # page can start before the last row is fetched. The query asks for one
+    # row more than the page; next_cursor is set once that row is seen.
+    def __init__(self, query, page_size):
+        self.query = query
+        self.page_size = page_size
+        self.next_cursor = None
+
+    def __iter__(self):
+        last = None
+        for n, row in enumerate(self.query.limit(self.page_size + 1)):
+            if n == self.page_size:
+                self.next_cursor = encode_show_cursor(last)
+                continue
+            last = row
+            yield {
+                'venue_id': row.venue_id,
+                'venue_name': row.venue_name,
+                'artist_id': row.artist_id,
+                'artist_name': row.artist_name,
+                'artist_image_link': row.artist_image_link,
+                'start_time': row.start_time,
+            }
+
+
+def show_page(after=None, upcoming_only=True, page_size=None):
+    # Keyset pagination over (start_time, id), served by ix_Shows_start_time_id.
+    # Only the columns pages/shows.html renders are selected.
+    page_size = max(1, min(page_size or current_app.config['SHOWS_PAGE_SIZE'], current_app.config['SHOWS_MAX_PAGE_SIZE']))
+    query = db.session.query(
+        Shows.id, Shows.start_time,
+        Shows.venue_id, Venue.name.label('venue_name'),
+        Shows.artist_id, Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link')
+    ).join(Venue, Shows.venue_id == Venue.id).join(Artist, Shows.artist_id == Artist.id) \
+        .filter(live(Venue), live(Artist))
+    if upcoming_only:
+        query = query.filter(Shows.start_time > datetime.utcnow())
+    if after:
+        query = query.filter(tuple_(Shows.start_time, Shows.id) > tuple_(*after))
+    return ShowPage(query.order_by(Shows.start_time, Shows.id), page_size)
+
+
+def show_listing(after=None, upcoming_only=True, page_size=None):
+    page = show_page(after, upcoming_only, page_size)
+    data = list(page)
+    return data, page.next_cursor
@@ -0,0 +1,135 @@
+#----------------------------------------------------------------------------#
+# Read-replica routing.
+#
+# GET and HEAD requests, and views marked @read_only (searches submitted by
+# POST), read from one of the replicas listed in SQLALCHEMY_REPLICA_URIS,
+# picked round-robin per request and skipped for REPLICA_RETRY_SECONDS after
+# a connection error. Everything else (write
+# handlers, flushes, UPDATE/DELETE statements, CLI commands) goes to the
+# primary. After a successful write the client is pinned to the primary for
+# REPLICA_STICKY_SECONDS, so the redirect that follows an edit reads its own
+# write even if the replicas lag behind; the response cache is bypassed for
+# it too, as a page cached from a lagging replica would defeat that.
+#----------------------------------------------------------------------------#
+
+import itertools
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc
+from sqlalchemy.sql.dml import UpdateBase
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def read_only(view):
+    # Marks a view that does not write whatever its method, so it reads from
+    # a replica and does not pin the client to the primary. Goes below
+    # @bp.route.
+    view.read_only = True
+    return view
+
+
+def pinned_to_primary():
+    # Whether the client wrote within REPLICA_STICKY_SECONDS and so reads
+    # from the primary.
+    return session.get('db_primary_until', 0) > time.time()
+
+
+def is_read_request():
+    if request.method in READ_METHODS:
+        return True
+    return getattr(current_app.view_functions.get(request.endpoint), 'read_only', False)
+
+
+class ReplicaRouter(object):
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.bind_keys = []
+        self.down_until = {}
+        self.cycle = iter(())
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Replicas become extra Flask-SQLAlchemy binds; call this before
+        # db.init_app so their engines are created.
+        app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [])
+        app.config.setdefault('REPLICA_STICKY_SECONDS', 5)
+        app.config.setdefault('REPLICA_RETRY_SECONDS', 30)
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        self.bind_keys = []
+        for i, uri in enumerate(app.config['SQLALCHEMY_REPLICA_URIS']):
+            key = 'replica_{}'.format(i)
+            binds[key] = uri
+            self.bind_keys.append(key)
+        self.down_until = {}
+        self.cycle = itertools.cycle(self.bind_keys)
+        app.extensions['replica_router'] = self
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def setup_engines(self, db):
+        # Called inside an app context once db is initialised.
+        for key in self.bind_keys:
+            event.listen(db.engines[key], 'handle_error', self._make_error_handler(key))
+
+    def _make_error_handler(self, key):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                retry = current_app.config['REPLICA_RETRY_SECONDS']
+                self.down_until[key] = time.monotonic() + retry
+                current_app.logger.warning('Replica %s marked down for %ss: %s', key, retry, context.original_exception)
+        return handle_error
+
+    def pick(self):
+        now = time.monotonic()
+        with self.lock:
+            for i in range(len(self.bind_keys)):
+                key = next(self.cycle)
+                if self.down_until.get(key, 0) <= now:
+                    return key
+        return None
+
+    def _before_request(self):
+        # The replica is chosen lazily, on the request's first query.
+        g.db_replica = None
+        g.db_replica_wanted = bool(self.bind_keys) and is_read_request() and not pinned_to_primary()
+
+    def _after_request(self, response):
+        if not is_read_request() and response.status_code < 400:
+            session['db_primary_until'] = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+        return response
+
+    def replica_engine(self, engines):
+        # Engine to read from for this request, or None for the primary. A
+        # replica that cannot hand out a connection is marked down here and
+        # the next one is tried, so the request itself still succeeds.
+        if not has_request_context() or not g.get('db_replica_wanted'):
+            return None
+        if g.db_replica is None:
+            g.db_replica_wanted = False
+            while True:
+                key = self.pick()
+                if key is None:
+                    return None
+                try:
+                    engines[key].connect().close()
+                except exc.DBAPIError:
+                    continue
+                g.db_replica = key
+                g.db_replica_wanted = True
+                break
+        return engines[g.db_replica]
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            router = current_app.extensions.get('replica_router')
+            engine = router.replica_engine(self._db.engines) if router else None
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,280 @@
+#----------------------------------------------------------------------------#
+# Scheduling.
+#
+# A show occupies its venue and its artist from start_time to end_time
+# (start_time + duration minutes). On Postgres the Shows exclusion
+# constraints guarantee that no two shows of a venue or an artist overlap;
+# book_shows() checks the same thing up front on every backend so the forms
+# and the API can say what is in the way. Because durations are capped at
+# MAX_SHOW_DURATION minutes, every overlap lookup is a bounded range scan of
+# the (venue_id, start_time) and (artist_id, start_time) indexes.
+#----------------------------------------------------------------------------#
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, exists, insert, literal, or_, select, union_all
+from sqlalchemy.exc import IntegrityError
+
+from fyyur.extensions import db
+from fyyur.models import Shows, Venue, Artist, DEFAULT_SHOW_DURATION, MAX_SHOW_DURATION
+from fyyur.queries import is_postgres, live, refresh_counters
+
+
+def show_end(start_time, duration=None):
+    return start_time + timedelta(minutes=duration or DEFAULT_SHOW_DURATION)
+
+
+def overlapping(start, end):
+    # Shows that overlap [start, end). The lower bound on start_time is
+    # implied by the end_time condition and lets the index bound the scan.
+    return and_(Shows.start_time > start - timedelta(minutes=MAX_SHOW_DURATION), Shows.start_time < end, Shows.end_time > start)
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_start_time(value):
+    # A datetime from the forms, or an ISO string from the API. Times with
+    # an offset are converted to naive UTC, like the columns.
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def known_entities(venue_ids, artist_ids):
+    # Names of the live venues and artists among the given ids, in one round
+    # trip.
+    rows = db.session.execute(union_all(
+        select(literal('venue'), Venue.id, Venue.name).where(Venue.id.in_(venue_ids), live(Venue)),
+        select(literal('artist'), Artist.id, Artist.name).where(Artist.id.in_(artist_ids), live(Artist)),
+    ))
+    return {(kind, entity_id): name for kind, entity_id, name in rows}
+
+
+def batch_conflicts(bookings):
+    # Existing shows in the way of any of the bookings: one statement whose
+    # OR branches are each a bounded range scan of a (venue_id, start_time)
+    # or (artist_id, start_time) index.
+    clauses = []
+    for booking in bookings:
+        window = overlapping(booking['start_time'], booking['end_time'])
+        clauses.append(and_(Shows.venue_id == booking['venue_id'], window))
+        clauses.append(and_(Shows.artist_id == booking['artist_id'], window))
+    rows = db.session.query(Shows.venue_id, Shows.artist_id, Shows.start_time, Shows.end_time,
+                            Venue.name.label('venue_name'), Artist.name.label('artist_name')) \
+        .join(Venue, Shows.venue_id == Venue.id) \
+        .join(Artist, Shows.artist_id == Artist.id) \
+        .filter(or_(*clauses)).order_by(Shows.start_time)
+    taken = {}
+    for row in rows:
+        taken.setdefault(('venue', row.venue_id), []).append(
+            {'kind': 'venue', 'name': row.venue_name, 'start_time': row.start_time, 'end_time': row.end_time})
+        taken.setdefault(('artist', row.artist_id), []).append(
+            {'kind': 'artist', 'name': row.artist_name, 'start_time': row.start_time, 'end_time': row.end_time})
+    return taken
+
+
+def check_bookings(results, names):
+    # Marks the results that cannot be booked: unknown ids, two bookings of
+    # the batch that overlap on a venue or an artist, and clashes with shows
+    # already booked.
+    for result in results:
+        for kind in ('venue', 'artist'):
+            entity_id = result[kind + '_id']
+            if entity_id is not None and (kind, entity_id) not in names:
+                result['errors'].append('There is no {} with id {}.'.format(kind, entity_id))
+
+    by_entity = {}
+    for result in results:
+        if not result['errors']:
+            for kind in ('venue', 'artist'):
+                by_entity.setdefault((kind, result[kind + '_id']), []).append(result)
+    for (kind, entity_id), bookings in by_entity.items():
+        bookings.sort(key=lambda result: result['start_time'])
+        for previous, result in zip(bookings, bookings[1:]):
+            if result['start_time'] < previous['end_time']:
+                result['errors'].append('The {} {} is also booked in row {}.'.format(
+                    kind, names[(kind, entity_id)], previous['row']))
+
+    pending = [result for result in results if not result['errors']]
+    taken = batch_conflicts(pending) if pending else {}
+    for result in pending:
+        for kind in ('venue', 'artist'):
+            for conflict in taken.get((kind, result[kind + '_id']), ()):
+                if conflict['start_time'] < result['end_time'] and conflict['end_time'] > result['start_time']:
+                    result['conflicts'].append(conflict)
+                    result['errors'].append('The {} {} is already booked from {} to {}.'.format(
+                        kind, conflict['name'], conflict['start_time'].strftime('%Y-%m-%d %H:%M'),
+                        conflict['end_time'].strftime('%Y-%m-%d %H:%M')))
+
+
+def insert_shows(accepted):
+    # One multi-row INSERT; returns the new show ids by (venue_id,
+    # start_time). RETURNING order is not guaranteed for a multi-row INSERT,
+    # but (venue_id, start_time) is unique within an accepted batch.
+    return {(venue_id, start_time): show_id for show_id, venue_id, start_time in db.session.execute(
+        insert(Shows).returning(Shows.id, Shows.venue_id, Shows.start_time),
+        [{key: result[key] for key in ('venue_id', 'artist_id', 'start_time', 'duration', 'end_time')}
+         for result in accepted]
+    )}
+
+
+def book_shows(bookings, all_or_nothing=True):
+    # Books a batch of shows, e.g. one artist's tour over several venues.
+    # Each booking is a dict with venue_id, artist_id (ids may still be raw
+    # strings), start_time, an optional duration and an optional row, the
+    # number messages refer to it by (its position by default). Returns one
+    # result per booking, in order, with status 'booked' (and show_id),
+    # 'rejected' (with errors) or, when all_or_nothing and another booking
+    # was rejected, 'skipped'. The valid bookings are inserted with one
+    # multi-row INSERT and the counters refreshed; the caller commits.
+    results = []
+    for row, booking in enumerate(bookings, 1):
+        result = {
+            'row': booking.get('row', row),
+            'venue_id': parse_id(booking.get('venue_id')),
+            'artist_id': parse_id(booking.get('artist_id')),
+            'start_time': parse_start_time(booking.get('start_time')),
+            'duration': parse_id(booking.get('duration') or DEFAULT_SHOW_DURATION),
+            'end_time': None,
+            'status': 'rejected',
+            'errors': [],
+            'conflicts': [],
+        }
+        for kind in ('venue', 'artist'):
+            if result[kind + '_id'] is None:
+                result['errors'].append('{} id {!r} is not a number.'.format(kind.capitalize(), booking.get(kind + '_id')))
+        if result['start_time'] is None:
+            result['errors'].append('Start time {!r} is not a date and time.'.format(booking.get('start_time')))
+        if result['duration'] is None or not 1 <= result['duration'] <= MAX_SHOW_DURATION:
+            result['errors'].append('Duration must be 1 to {} minutes.'.format(MAX_SHOW_DURATION))
+        elif result['start_time'] is not None:
+            result['end_time'] = show_end(result['start_time'], result['duration'])
+        results.append(result)
+
+    names = known_entities({result['venue_id'] for result in results if result['venue_id'] is not None},
+                           {result['artist_id'] for result in results if result['artist_id'] is not None})
+    parse_errors = [list(result['errors']) for result in results]
+    # On Postgres a booking committed since the check trips the exclusion
+    # constraints; the savepoint is rolled back and the batch checked again.
+    # SQLite has no such constraints, and pysqlite issues no BEGIN before a
+    # SAVEPOINT, so there its RELEASE would commit the INSERT: no savepoint.
+    for attempt in range(2):
+        for result, errors in zip(results, parse_errors):
+            result['errors'] = list(errors)
+            result['conflicts'] = []
+        check_bookings(results, names)
+        accepted = [result for result in results if not result['errors']]
+        if not accepted or (all_or_nothing and len(accepted) < len(results)):
+            accepted = []
+            break
+        if not is_postgres():
+            show_ids = insert_shows(accepted)
+            break
+        try:
+            with db.session.begin_nested():
+                show_ids = insert_shows(accepted)
+            break
+        except IntegrityError as error:
+            if attempt or not is_exclusion_violation(error):
+                raise
+
+    for result in results:
+        result['venue_name'] = names.get(('venue', result['venue_id']))
+        result['artist_name'] = names.get(('artist', result['artist_id']))
+        if not result['errors'] and accepted:
+            result['status'] = 'booked'
+        elif not result['errors']:
+            result['status'] = 'skipped'
+    if accepted:
+        for result in accepted:
+            result['show_id'] = show_ids[(result['venue_id'], result['start_time'])]
+        refresh_counters(Venue, Venue.id.in_({result['venue_id'] for result in accepted}))
+        refresh_counters(Artist, Artist.id.in_({result['artist_id'] for result in accepted}))
+    return results
+
+
+def booking_tags(results):
+    # Cache tags of the pages that list the booked shows.
+    tags = {'shows', 'venues', 'artists'}
+    for result in results:
+        if result['status'] == 'booked':
+            tags.update(('venue:{}'.format(result['venue_id']), 'artist:{}'.format(result['artist_id'])))
+    return tags
+
+
+def is_exclusion_violation(error):
+    # Postgres reports a lost race on the exclusion constraints as SQLSTATE
+    # 23P01.
+    return getattr(getattr(error, 'orig', None), 'pgcode', None) == '23P01' \
+        or 'ex_Shows_' in str(getattr(error, 'orig', ''))
+
+
+class IntervalIndex(object):
+    # In-memory interval index over one venue's or artist's bookings.
+    # Overlapping bookings (possible in data created before the exclusion
+    # constraints, or on SQLite where there are none) are merged, so the
+    # index holds disjoint intervals sorted by start; their ends are then
+    # sorted as well and both overlap and gap queries are a binary search
+    # followed by a walk over the k intervals involved, O(log n + k).
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start, end):
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def gaps(self, start, end, min_length=timedelta(0)):
+        # Free [from, to) ranges within [start, end) at least min_length long.
+        free = []
+        cursor = start
+        i = bisect_right(self.ends, start)
+        while cursor < end:
+            if i < len(self.starts) and self.starts[i] < end:
+                gap_end, next_cursor = self.starts[i], self.ends[i]
+                i += 1
+            else:
+                gap_end, next_cursor = end, end
+            if gap_end - cursor >= min_length and gap_end > cursor:
+                free.append((cursor, gap_end))
+            cursor = max(cursor, next_cursor)
+        return free
+
+
+def venue_index(venue_id, start, end):
+    rows = db.session.query(Shows.start_time, Shows.end_time) \
+        .filter(Shows.venue_id == venue_id, overlapping(start, end))
+    return IntervalIndex((row.start_time, row.end_time) for row in rows)
+
+
+def free_slots(venue_id, start, end, min_minutes=0):
+    slots = venue_index(venue_id, start, end).gaps(start, end, timedelta(minutes=min_minutes))
+    return [{'start_time': slot_start, 'end_time': slot_end} for slot_start, slot_end in slots]
+
+
+def free_artists(start, end):
+    # Artists with no show overlapping [start, end): an anti-join that probes
+    # the (artist_id, start_time) index once per artist.
+    booked = exists().where(Shows.artist_id == Artist.id, overlapping(start, end))
+    return [{'id': row.id, 'name': row.name}
+            for row in db.session.query(Artist.id, Artist.name).filter(~booked, live(Artist))
+            .order_by(Artist.name, Artist.id)]
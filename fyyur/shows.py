@@ -0,0 +1,131 @@
+#----------------------------------------------------------------------------#
+# Shows.
+#----------------------------------------------------------------------------#
+
+import sys
+
+from flask import Blueprint, render_template, request, flash, abort
+
+from fyyur.extensions import db, cache
+from fyyur.areas import upcoming_in_area
+from fyyur.queries import decode_show_cursor, show_page
+from fyyur.scheduling import book_shows, booking_tags
+from fyyur.streaming import render_listing
+
+bp = Blueprint('shows', __name__)
+
+
+@bp.route('/shows')
+@cache.cached(lambda: ['shows'])
+def shows():
+    scope = request.args.get('scope', 'upcoming')
+    try:
+        after = decode_show_cursor(request.args['after']) if request.args.get('after') else None
+    except ValueError:
+        abort(400)
+    page = show_page(
+        after=after,
+        upcoming_only=scope != 'all',
+        page_size=request.args.get('page_size', type=int)
+    )
+    return render_listing('pages/shows.html', shows=page, scope=scope)
+
+
+@bp.route('/upcoming')
+@cache.cached(lambda: ['upcoming', 'shows', 'venues', 'artists'])
+def upcoming():
+    from fyyur.choices import state_choices
+    state = request.args.get('state', '')
+    city = request.args.get('city', '').strip()
+    days = min(max(request.args.get('days', 7, type=int), 1), 31)
+    groups = upcoming_in_area(state, city, days) if state and city else []
+    return render_template('pages/upcoming.html', groups=groups, state=state, city=city, days=days,
+                           states=state_choices)
+
+
+@bp.route('/shows/create')
+def create_shows():
+    from fyyur.forms import ShowForm
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    from fyyur.forms import ShowForm
+    error = False
+    try:
+        form = ShowForm()
+        result, = book_shows([{
+            'venue_id': form.venue_id.data,
+            'artist_id': form.artist_id.data,
+            'start_time': form.start_time.data,
+            'duration': form.duration.data,
+        }])
+        db.session.commit()
+        cache.invalidate(*booking_tags([result]))
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if(error):
+        flash('An error occurred. Show could not be listed.')
+        abort(400)
+    elif(result['errors']):
+        for message in result['errors']:
+            flash(message)
+        return render_template('forms/new_show.html', form=ShowForm()), 409 if result['conflicts'] else 400
+    else:
+        flash('Show was successfully listed!')
+        return render_template('pages/home.html')
+
+
+@bp.route('/shows/tour')
+def create_tour_form():
+    from fyyur.forms import TourForm
+    form = TourForm()
+    # ?rows=20 for a longer tour.
+    while len(form.dates) < min(request.args.get('rows', 0, type=int), form.dates.max_entries):
+        form.dates.append_entry()
+    return render_template('forms/new_tour.html', form=form, results=None)
+
+
+@bp.route('/shows/tour', methods=['POST'])
+def create_tour_submission():
+    # One artist at several venues, or one venue hosting several artists,
+    # booked in one transaction. The page lists what happened to each date.
+    from fyyur.forms import TourForm
+    form = TourForm()
+    if not form.validate():
+        return render_template('forms/new_tour.html', form=form, results=None), 400
+    other = 'venue_id' if form.kind.data == 'artist' else 'artist_id'
+    bookings = [{
+        form.kind.data + '_id': form.fixed_id.data,
+        other: date['other_id'],
+        'start_time': date['start_time'],
+        'duration': date['duration'],
+    } for date in form.dates.data if date['other_id'] or date['start_time']]
+    if not bookings:
+        flash('Add at least one date.')
+        return render_template('forms/new_tour.html', form=form, results=None), 400
+
+    error = False
+    try:
+        results = book_shows(bookings, form.all_or_nothing.data)
+        db.session.commit()
+        cache.invalidate(*booking_tags(results))
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if(error):
+        flash('An error occurred. The tour could not be booked.')
+        abort(400)
+    booked = sum(result['status'] == 'booked' for result in results)
+    flash('{} of {} shows booked.'.format(booked, len(results)))
+    return render_template('forms/new_tour.html', form=form, results=results), 200 if booked == len(results) else 409
@@ -0,0 +1,44 @@
+#----------------------------------------------------------------------------#
+# Streamed listing pages.
+#
+# With STREAM_LISTINGS on, the venue, artist and show listings are rendered
+# with Template.generate() inside stream_with_context, from query iterators
+# that fetch rows in batches (yield_per). The layout header and the first
+# rows go out while later rows are still being read, and a page of any size
+# needs about one batch of memory. Output is sent in chunks of roughly
+# STREAM_CHUNK_BYTES rather than one write per template statement.
+#----------------------------------------------------------------------------#
+
+from flask import current_app, get_flashed_messages, render_template, stream_with_context
+
+
+def buffered(chunks, size):
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_page(template_name, **context):
+    app = current_app._get_current_object()
+    # The session cookie is written before the body, so flashed messages are
+    # popped now; the layout's get_flashed_messages() call reads them back
+    # from the request.
+    get_flashed_messages()
+    template = app.jinja_env.get_or_select_template(template_name)
+    app.update_template_context(context)
+    chunks = buffered(template.generate(context), app.config['STREAM_CHUNK_BYTES'])
+    return app.response_class(stream_with_context(chunks), mimetype='text/html')
+
+
+def render_listing(template_name, **context):
+    if current_app.config['STREAM_LISTINGS']:
+        return stream_page(template_name, **context)
+    return render_template(template_name, **context)
@@ -0,0 +1,198 @@
+#----------------------------------------------------------------------------#
+# Venues.
+#----------------------------------------------------------------------------#
+
+import sys
+
+from flask import Blueprint, render_template, request, flash, redirect, url_for, abort, jsonify
+
+from fyyur.choices import state_choices
+from fyyur.deletion import delete_entity
+from fyyur.editing import EditConflict, apply_edit, conflicting_fields, edit_tags, form_values
+from fyyur.extensions import db, cache
+from fyyur.facets import browse, parse_filters
+from fyyur.models import Venue
+from fyyur.queries import venue_areas, venue_detail, search_entities, get_live
+from fyyur.routing import read_only
+from fyyur.streaming import render_listing
+
+bp = Blueprint('venues', __name__)
+
+
+@bp.route('/venues')
+@cache.cached(lambda: ['venues'])
+def venues():
+    return render_listing('pages/venues.html', areas=venue_areas())
+
+
+@bp.route('/venues/browse')
+@cache.cached(lambda: ['venues'])
+def browse_venues():
+    filters = parse_filters(request.args)
+    page = max(request.args.get('page', 1, type=int), 1)
+    results = browse(Venue, filters, page)
+    return render_template('pages/browse.html', kind='venues', results=results, filters=filters,
+                           states=state_choices)
+
+
+@bp.route('/venues/search', methods=['POST'])
+@read_only
+def search_venues():
+    search_term = request.form.get('search_term', '')
+    page = request.form.get('page', 1, type=int)
+    response = search_entities(Venue, search_term, max(page, 1))
+    return render_template('pages/search_venues.html', results=response, search_term=search_term)
+
+
+@bp.route('/venues/<int:venue_id>')
+@cache.cached(lambda venue_id: ['venue:{}'.format(venue_id)])
+def show_venue(venue_id):
+    data = venue_detail(venue_id)
+    if(not data):
+        flash("There is no Venue with id {}.".format(venue_id))
+        return render_template('pages/home.html')
+
+    return render_template('pages/show_venue.html', venue=data)
+
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    from fyyur.forms import VenueForm
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    from fyyur.forms import VenueForm
+    error = False
+    try:
+        form = VenueForm()
+        new_venue = Venue(
+            name=form.name.data,
+            genres=form.genres.data,
+            address=form.address.data,
+            city=form.city.data,
+            state=form.state.data,
+            phone=form.phone.data,
+            facebook_link=form.facebook_link.data,
+            image_link=form.image_link.data
+        )
+        db.session.add(new_venue)
+        db.session.commit()
+        cache.invalidate('venues')
+        flash('Venue ' + request.form['name'] + ' was successfully listed!')
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if(error):
+        flash('An error occurred. Venue ' + request.form['name'] + ' could not be listed.')
+        abort(400)
+    else:
+        flash('The Venue was successfully created')
+        return render_template('pages/home.html')
+
+
+@bp.route('/venues/<int:venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+    error = False
+    deleted = False
+    try:
+        deleted = delete_entity(Venue, venue_id)
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if error:
+        return jsonify({'success': False}), 500
+    if not deleted:
+        return jsonify({'success': False}), 404
+    return jsonify({'success': True})
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    from fyyur.forms import EditVenueForm
+    form = EditVenueForm()
+    aux_venue = get_live(Venue, venue_id)
+    if aux_venue is None:
+        abort(404)
+    form.name.data = aux_venue.name
+    form.genres.data = aux_venue.genres
+    form.address.data = aux_venue.address
+    form.city.data = aux_venue.city
+    form.state.data = aux_venue.state
+    form.phone.data = aux_venue.phone
+    form.facebook_link.data = aux_venue.facebook_link
+    form.image_link.data = aux_venue.image_link
+
+    venue = {
+        "id": venue_id,
+        "name": aux_venue.name,
+        "genres": aux_venue.genres,
+        "address": aux_venue.address,
+        "city": aux_venue.city,
+        "state": aux_venue.state,
+        "phone": aux_venue.phone,
+        "website": aux_venue.website,
+        "facebook_link": aux_venue.facebook_link,
+        "seeking_talent": aux_venue.seeking_talent if aux_venue.seeking_talent else False,
+        "seeking_description": aux_venue.seeking_description,
+        "image_link": aux_venue.image_link,
+        "version": aux_venue.version,
+    }
+    return render_template('forms/edit_venue.html', form=form, venue=venue, conflicts=None)
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    # Saves only the changed fields, and only if nobody else saved the venue
+    # since the form was rendered; otherwise the form comes back with their
+    # values listed and the current version, so saving again overrides them.
+    from fyyur.forms import EditVenueForm
+    form = EditVenueForm()
+    venue = {'id': venue_id, 'name': form.name.data, 'version': form.version.data}
+    if not form.validate():
+        for field, messages in form.errors.items():
+            for message in messages:
+                flash('{}: {}'.format(field, message))
+        return render_template('forms/edit_venue.html', form=form, venue=venue, conflicts=None), 400
+
+    error = False
+    changed = None
+    conflicts = None
+    values = form_values(form)
+    try:
+        changed = apply_edit(Venue, venue_id, form.version.data, values)
+        tags = edit_tags(Venue, venue_id, changed) if changed else []
+        db.session.commit()
+        cache.invalidate(*tags)
+    except EditConflict as conflict:
+        if conflict.current is not None:
+            conflicts = conflicting_fields(conflict.current, values) or None
+            venue['version'] = conflict.current.version
+            # No conflicts left: the other edit saved what this one would.
+            changed = set() if conflicts is None else None
+        db.session.rollback()
+    except:
+        print(sys.exc_info())
+        error = True
+        db.session.rollback()
+    finally:
+        db.session.close()
+    if(error):
+        flash('An error occurred while updating the venue.')
+        return render_template('pages/home.html')
+    elif conflicts is not None:
+        flash('Someone else saved this venue while you were editing it. Their values are shown below; '
+              'save again to replace them with yours.')
+        return render_template('forms/edit_venue.html', form=form, venue=venue, conflicts=conflicts), 409
+    elif changed is None:
+        abort(404)
+    else:
+        return redirect(url_for('venues.show_venue', venue_id=venue_id))
@@ -0,0 +1,39 @@
+"""search indexes on venue and artist names, areas and genres
+
+Revision ID: 3f2a7c9d1e5b
+Revises: 94934f5fc47b
+Create Date: 2026-10-18 10:12:41.318207
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a7c9d1e5b'
+down_revision = '94934f5fc47b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('Venue', 'Artist'):
+        if postgres:
+            op.create_index('ix_{}_name_trgm'.format(table), table, ['name'],
+                            postgresql_using='gin',
+                            postgresql_ops={'name': 'gin_trgm_ops'})
+            op.create_index('ix_{}_genres'.format(table), table, ['genres'],
+                            postgresql_using='gin')
+        else:
+            op.create_index('ix_{}_name_trgm'.format(table), table, ['name'])
+            op.create_index('ix_{}_genres'.format(table), table, ['genres'])
+        op.create_index('ix_{}_state_city'.format(table), table, ['state', 'city'])
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_index('ix_{}_state_city'.format(table), table_name=table)
+        op.drop_index('ix_{}_genres'.format(table), table_name=table)
+        op.drop_index('ix_{}_name_trgm'.format(table), table_name=table)
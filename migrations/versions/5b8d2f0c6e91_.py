@@ -0,0 +1,61 @@
+"""upcoming shows by area: UpcomingByArea summary table and materialized view
+
+Revision ID: 5b8d2f0c6e91
+Revises: a7c3e9f14d28
+Create Date: 2026-10-18 15:41:07.226915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8d2f0c6e91'
+down_revision = 'a7c3e9f14d28'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'show_id, state, city, day, start_time, venue_id, venue_name, artist_id, artist_name, artist_image_link'
+UPCOMING = '''SELECT s.id AS show_id, v.state, v.city, date(s.start_time) AS day, s.start_time,
+    v.id AS venue_id, v.name AS venue_name, a.id AS artist_id, a.name AS artist_name,
+    a.image_link AS artist_image_link
+    FROM "Shows" s JOIN "Venue" v ON v.id = s.venue_id JOIN "Artist" a ON a.id = s.artist_id
+    WHERE s.start_time > (now() AT TIME ZONE 'utc')'''
+
+
+def upgrade():
+    op.create_table('UpcomingByArea',
+    sa.Column('show_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('state', sa.String(length=120), nullable=True),
+    sa.Column('city', sa.String(length=120), nullable=True),
+    sa.Column('day', sa.Date(), nullable=True),
+    sa.Column('start_time', sa.DateTime(), nullable=True),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('venue_name', sa.String(), nullable=True),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('artist_name', sa.String(), nullable=True),
+    sa.Column('artist_image_link', sa.String(length=2000), nullable=True),
+    sa.PrimaryKeyConstraint('show_id')
+    )
+    op.create_index('ix_UpcomingByArea_state_city_start_time', 'UpcomingByArea', ['state', 'city', 'start_time'], unique=False)
+    op.create_index('ix_UpcomingByArea_venue_id', 'UpcomingByArea', ['venue_id'], unique=False)
+    op.create_index('ix_UpcomingByArea_artist_id', 'UpcomingByArea', ['artist_id'], unique=False)
+    op.execute('INSERT INTO "UpcomingByArea" ({}) {}'.format(COLUMNS, UPCOMING))
+
+    # REFRESH ... CONCURRENTLY needs a unique index on the view.
+    op.execute('CREATE MATERIALIZED VIEW "UpcomingByAreaView" AS {}'.format(UPCOMING))
+    op.execute('CREATE UNIQUE INDEX "ix_UpcomingByAreaView_show_id" ON "UpcomingByAreaView" (show_id)')
+    op.execute('CREATE INDEX "ix_UpcomingByAreaView_state_city_start_time" ON "UpcomingByAreaView" (state, city, start_time)')
+
+
+def downgrade():
+    # Triggers installed by `flask upcoming-area install-triggers`.
+    op.execute('DROP TRIGGER IF EXISTS upcoming_by_area_shows ON "Shows"')
+    op.execute('DROP TRIGGER IF EXISTS upcoming_by_area_venue ON "Venue"')
+    op.execute('DROP TRIGGER IF EXISTS upcoming_by_area_artist ON "Artist"')
+    op.execute('DROP FUNCTION IF EXISTS upcoming_by_area_sync()')
+    op.execute('DROP MATERIALIZED VIEW "UpcomingByAreaView"')
+    op.drop_index('ix_UpcomingByArea_artist_id', table_name='UpcomingByArea')
+    op.drop_index('ix_UpcomingByArea_venue_id', table_name='UpcomingByArea')
+    op.drop_index('ix_UpcomingByArea_state_city_start_time', table_name='UpcomingByArea')
+    op.drop_table('UpcomingByArea')
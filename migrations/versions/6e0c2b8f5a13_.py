@@ -0,0 +1,39 @@
+"""upcoming show counters on Venue and Artist
+
+Revision ID: 6e0c2b8f5a13
+Revises: d4a9e1f37b6c
+Create Date: 2026-10-18 12:25:48.907361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e0c2b8f5a13'
+down_revision = 'd4a9e1f37b6c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('next_show_time', sa.DateTime(), nullable=True))
+
+    shows = sa.table('Shows', sa.column('venue_id'), sa.column('artist_id'), sa.column('start_time'))
+    # start_time is naive UTC; now() is a timestamptz in the session time zone.
+    now = sa.literal_column("(now() AT TIME ZONE 'utc')")
+    for table, fk in (('Venue', shows.c.venue_id), ('Artist', shows.c.artist_id)):
+        entity = sa.table(table, sa.column('id'), sa.column('upcoming_shows_count'), sa.column('next_show_time'))
+        upcoming = sa.and_(fk == entity.c.id, shows.c.start_time > now)
+        op.execute(entity.update().values(
+            upcoming_shows_count=sa.select(sa.func.count()).select_from(shows).where(upcoming).scalar_subquery(),
+            next_show_time=sa.select(sa.func.min(shows.c.start_time)).where(upcoming).scalar_subquery(),
+        ))
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'next_show_time')
+        op.drop_column(table, 'upcoming_shows_count')
@@ -0,0 +1,46 @@
+"""show duration and end_time, no overlapping shows per venue or artist
+
+Revision ID: a7c3e9f14d28
+Revises: 6e0c2b8f5a13
+Create Date: 2026-10-18 14:02:31.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f14d28'
+down_revision = '6e0c2b8f5a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Shows', sa.Column('duration', sa.Integer(), server_default='120', nullable=False))
+    op.add_column('Shows', sa.Column('end_time', sa.DateTime(), nullable=True))
+    op.execute('UPDATE "Shows" SET end_time = start_time + interval \'120 minutes\'')
+    op.alter_column('Shows', 'end_time', nullable=False)
+
+    # Existing double bookings would make the constraints fail to build;
+    # list them so they can be fixed by hand first.
+    for column in ('venue_id', 'artist_id'):
+        clashes = op.get_bind().execute(sa.text(
+            'SELECT a.id, b.id FROM "Shows" a JOIN "Shows" b ON a.{0} = b.{0} AND a.id < b.id '
+            'AND a.start_time < b.end_time AND b.start_time < a.end_time LIMIT 20'.format(column)
+        )).all()
+        if clashes:
+            raise RuntimeError('Overlapping shows on the same {}: {}'.format(
+                column, ', '.join('{}/{}'.format(a, b) for a, b in clashes)))
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    for column in ('venue_id', 'artist_id'):
+        op.execute('ALTER TABLE "Shows" ADD CONSTRAINT "ex_Shows_{0}_period" '
+                   'EXCLUDE USING gist ({0} WITH =, tsrange(start_time, end_time) WITH &&)'.format(column))
+
+
+def downgrade():
+    for column in ('artist_id', 'venue_id'):
+        op.drop_constraint('ex_Shows_{}_period'.format(column), 'Shows')
+    op.drop_column('Shows', 'end_time')
+    op.drop_column('Shows', 'duration')
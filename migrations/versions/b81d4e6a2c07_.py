@@ -0,0 +1,23 @@
+"""composite index on Shows(start_time, id) for keyset pagination
+
+Revision ID: b81d4e6a2c07
+Revises: 3f2a7c9d1e5b
+Create Date: 2026-10-18 11:02:17.550914
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81d4e6a2c07'
+down_revision = '3f2a7c9d1e5b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_Shows_start_time_id', 'Shows', ['start_time', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_Shows_start_time_id', table_name='Shows')
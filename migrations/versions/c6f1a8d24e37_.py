@@ -0,0 +1,75 @@
+"""soft delete of venues and artists: deleted_at, partial read indexes
+
+Revision ID: c6f1a8d24e37
+Revises: 5b8d2f0c6e91
+Create Date: 2026-10-18 18:12:44.603118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f1a8d24e37'
+down_revision = '5b8d2f0c6e91'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('deleted_at IS NULL')
+DELETED = sa.text('deleted_at IS NOT NULL')
+UPCOMING = '''SELECT s.id AS show_id, v.state, v.city, date(s.start_time) AS day, s.start_time,
+    v.id AS venue_id, v.name AS venue_name, a.id AS artist_id, a.name AS artist_name,
+    a.image_link AS artist_image_link
+    FROM "Shows" s JOIN "Venue" v ON v.id = s.venue_id JOIN "Artist" a ON a.id = s.artist_id
+    WHERE s.start_time > (now() AT TIME ZONE 'utc')'''
+
+
+def create_read_indexes(table, postgres, where=None):
+    options = {'postgresql_where': where, 'sqlite_where': where} if where is not None else {}
+    if postgres:
+        op.create_index('ix_{}_name_trgm'.format(table), table, ['name'], postgresql_using='gin',
+                        postgresql_ops={'name': 'gin_trgm_ops'}, **options)
+        op.create_index('ix_{}_genres'.format(table), table, ['genres'], postgresql_using='gin', **options)
+    else:
+        op.create_index('ix_{}_name_trgm'.format(table), table, ['name'], **options)
+        op.create_index('ix_{}_genres'.format(table), table, ['genres'], **options)
+    op.create_index('ix_{}_state_city'.format(table), table, ['state', 'city'], **options)
+
+
+def drop_read_indexes(table):
+    op.drop_index('ix_{}_state_city'.format(table), table_name=table)
+    op.drop_index('ix_{}_genres'.format(table), table_name=table)
+    op.drop_index('ix_{}_name_trgm'.format(table), table_name=table)
+
+
+def create_view(where):
+    op.execute('CREATE MATERIALIZED VIEW "UpcomingByAreaView" AS {} {}'.format(UPCOMING, where))
+    op.execute('CREATE UNIQUE INDEX "ix_UpcomingByAreaView_show_id" ON "UpcomingByAreaView" (show_id)')
+    op.execute('CREATE INDEX "ix_UpcomingByAreaView_state_city_start_time" ON "UpcomingByAreaView" (state, city, start_time)')
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        # Every read filters on deleted_at IS NULL, so the read indexes only
+        # need the live rows; the purge job reads ix_<table>_deleted_at.
+        drop_read_indexes(table)
+        create_read_indexes(table, postgres, LIVE)
+        op.create_index('ix_{}_deleted_at'.format(table), table, ['deleted_at'],
+                        postgresql_where=DELETED, sqlite_where=DELETED)
+    if postgres:
+        op.execute('DROP MATERIALIZED VIEW "UpcomingByAreaView"')
+        create_view('AND v.deleted_at IS NULL AND a.deleted_at IS NULL')
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        op.execute('DROP MATERIALIZED VIEW "UpcomingByAreaView"')
+        create_view('')
+    for table in ('Artist', 'Venue'):
+        op.drop_index('ix_{}_deleted_at'.format(table), table_name=table)
+        drop_read_indexes(table)
+        create_read_indexes(table, postgres)
+        op.drop_column(table, 'deleted_at')
@@ -0,0 +1,27 @@
+"""indexes on Shows foreign keys combined with start_time
+
+Revision ID: d4a9e1f37b6c
+Revises: b81d4e6a2c07
+Create Date: 2026-10-18 11:40:05.102733
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9e1f37b6c'
+down_revision = 'b81d4e6a2c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Venue(state, city) for the area grouping already exists as
+    # ix_Venue_state_city (revision 3f2a7c9d1e5b).
+    op.create_index('ix_Shows_venue_id_start_time', 'Shows', ['venue_id', 'start_time'])
+    op.create_index('ix_Shows_artist_id_start_time', 'Shows', ['artist_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_Shows_artist_id_start_time', table_name='Shows')
+    op.drop_index('ix_Shows_venue_id_start_time', table_name='Shows')
@@ -0,0 +1,26 @@
+"""version column on Venue and Artist for optimistic locking
+
+Revision ID: e3b7d05a9c42
+Revises: c6f1a8d24e37
+Create Date: 2026-10-18 19:05:31.774610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b7d05a9c42'
+down_revision = 'c6f1a8d24e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'version')
@@ -0,0 +1,82 @@
+'''
+Optimistic venue edits: a save is refused when the row changed since the
+form was rendered, and only changed columns are written.
+'''
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from fyyur import create_app
+from fyyur.extensions import db
+from fyyur.models import Venue
+
+FORM = {
+    'name': 'The Venue', 'city': 'City', 'state': 'CA', 'address': '1 Main St', 'phone': '555-0100',
+    'genres': ['Jazz'], 'facebook_link': 'https://www.facebook.com/venue', 'image_link': '',
+}
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add(Venue(**FORM))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def current_venue(app):
+    with app.app_context():
+        venue = db.session.get(Venue, 1)
+        db.session.expunge(venue)
+        return venue
+
+
+def updates_of(client, path, data):
+    # The UPDATE statements issued by one POST, and its response.
+    issued = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('UPDATE'):
+            issued.append(statement)
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        response = client.post(path, data=data)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+    return issued, response
+
+
+def test_stale_version_is_refused_then_saved_with_the_current_one(app):
+    client = app.test_client()
+    version = current_venue(app).version
+    # Someone else saves first.
+    response = client.post('/venues/1/edit', data=dict(FORM, phone='555-0101', version=version))
+    assert response.status_code == 302
+
+    response = client.post('/venues/1/edit', data=dict(FORM, phone='555-0102', version=version))
+    assert response.status_code == 409
+    assert '555-0101' in response.get_data(as_text=True)
+    assert current_venue(app).phone == '555-0101'
+
+    response = client.post('/venues/1/edit', data=dict(FORM, phone='555-0102', version=version + 1))
+    assert response.status_code == 302
+    venue = current_venue(app)
+    assert (venue.phone, venue.version) == ('555-0102', version + 2)
+
+
+def test_only_changed_columns_are_written(app):
+    client = app.test_client()
+    version = current_venue(app).version
+    updates, response = updates_of(client, '/venues/1/edit', dict(FORM, version=version))
+    assert response.status_code == 302
+    assert updates == []
+    assert current_venue(app).version == version
+
+    updates, response = updates_of(client, '/venues/1/edit', dict(FORM, phone='555-0199', version=version))
+    assert response.status_code == 302
+    assert len(updates) == 1
+    assert 'SET phone=?, version=?' in updates[0]
+    assert 'AND "Venue".version = ?' in updates[0]
@@ -0,0 +1,11 @@
+'''
+Modules that should load lazily must not be imported by create_app(); see
+benchmarks/import_time.py for the timings themselves.
+'''
+from benchmarks.import_time import LAZY_MODULES, import_times
+
+
+def test_create_app_imports_no_lazy_modules():
+    loaded = {name.strip().split('.')[0] for self_us, cumulative_us, name in import_times()}
+    assert loaded, 'no import times were reported'
+    assert not loaded & set(LAZY_MODULES)
@@ -0,0 +1,61 @@
+'''
+Statements issued by the venue and artist pages, counted with an engine
+listener. The pages load the entity, its shows and the counterparts of
+those shows with one statement each, however many shows there are; a
+change to that shows up here.
+'''
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from benchmarks.seed import seed
+from fyyur import create_app
+from fyyur.extensions import db
+from fyyur.models import Shows
+
+DETAIL_PAGE_STATEMENTS = 3
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = create_app()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        seed(venues=20, artists=30, shows=400)
+        db.session.remove()
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def statements_of(client, path):
+    # The statements issued by one GET, and its response.
+    issued = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        issued.append(statement)
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+    return issued, response
+
+
+def busiest(app, fk):
+    # The venue or artist with the most shows.
+    with app.app_context():
+        entity_id, shows = db.session.query(fk, db.func.count()).group_by(fk) \
+            .order_by(db.func.count().desc()).first()
+        db.session.remove()
+    assert shows > 1
+    return entity_id
+
+
+@pytest.mark.parametrize('path, fk', [
+    ('/venues/{}', Shows.venue_id),
+    ('/artists/{}', Shows.artist_id),
+])
+def test_detail_page_statements(app, path, fk):
+    issued, response = statements_of(app.test_client(), path.format(busiest(app, fk)))
+    assert response.status_code == 200
+    assert len(issued) == DETAIL_PAGE_STATEMENTS, issued
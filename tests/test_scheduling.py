@@ -0,0 +1,105 @@
+'''
+Booking shows: overlap checks, batches and the in-memory interval index.
+'''
+from datetime import datetime, timedelta
+
+import pytest
+
+from fyyur import create_app
+from fyyur.extensions import db
+from fyyur.models import Shows, Venue, Artist
+from fyyur.scheduling import IntervalIndex, book_shows
+
+START = (datetime.utcnow() + timedelta(days=30)).replace(hour=20, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def app():
+    # A fresh in-memory database per test, with two venues and two artists.
+    app = create_app()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add_all([Venue(name='Venue {}'.format(i), city='City', state='CA', genres=['Jazz'])
+                            for i in (1, 2)])
+        db.session.add_all([Artist(name='Artist {}'.format(i), city='City', state='CA', genres=['Jazz'])
+                            for i in (1, 2)])
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def booking(venue_id, artist_id, start_time, duration=120):
+    return {'venue_id': venue_id, 'artist_id': artist_id, 'start_time': start_time, 'duration': duration}
+
+
+def test_overlapping_show_is_refused_with_409(app):
+    client = app.test_client()
+    form = {'venue_id': '1', 'artist_id': '1', 'duration': '120'}
+    response = client.post('/shows/create', data=dict(form, start_time=START.strftime('%Y-%m-%d %H:%M:%S')))
+    assert response.status_code == 200
+    later = (START + timedelta(minutes=30)).strftime('%Y-%m-%d %H:%M:%S')
+    response = client.post('/shows/create', data=dict(form, artist_id='2', start_time=later))
+    assert response.status_code == 409
+    with app.app_context():
+        assert db.session.query(Shows).count() == 1
+
+
+def test_clash_within_a_batch_names_the_row(app):
+    with app.app_context():
+        results = book_shows([
+            booking(1, 1, START),
+            booking(2, 1, START + timedelta(minutes=60)),
+        ], all_or_nothing=False)
+        db.session.commit()
+        assert [result['status'] for result in results] == ['booked', 'rejected']
+        assert results[1]['errors'] == ['The artist Artist 1 is also booked in row 1.']
+        assert db.session.query(Shows).count() == 1
+
+
+def test_all_or_nothing_skips_the_valid_rows(app):
+    with app.app_context():
+        results = book_shows([
+            booking(1, 1, START),
+            booking(3, 2, START),
+            booking(2, 2, START + timedelta(days=1)),
+        ])
+        db.session.commit()
+        assert [result['status'] for result in results] == ['skipped', 'rejected', 'skipped']
+        assert results[1]['errors'] == ['There is no venue with id 3.']
+        assert db.session.query(Shows).count() == 0
+
+
+def test_booking_refreshes_the_counters(app):
+    with app.app_context():
+        book_shows([booking(1, 1, START + timedelta(days=2)), booking(1, 2, START)])
+        db.session.commit()
+        venue, artist = db.session.get(Venue, 1), db.session.get(Artist, 2)
+        assert (venue.upcoming_shows_count, venue.next_show_time) == (2, START)
+        assert (artist.upcoming_shows_count, artist.next_show_time) == (1, START)
+        assert db.session.get(Venue, 2).upcoming_shows_count == 0
+
+
+def test_interval_index_boundaries():
+    hour = timedelta(hours=1)
+    index = IntervalIndex([(START, START + 2 * hour), (START + hour, START + 3 * hour),
+                           (START + 5 * hour, START + 6 * hour)])
+    # The first two are merged; intervals are half-open.
+    assert list(zip(index.starts, index.ends)) == [(START, START + 3 * hour), (START + 5 * hour, START + 6 * hour)]
+    assert not index.overlaps(START - hour, START)
+    assert not index.overlaps(START + 3 * hour, START + 5 * hour)
+    assert index.overlaps(START + 3 * hour - timedelta(minutes=1), START + 4 * hour)
+    assert index.overlaps(START + 4 * hour, START + 5 * hour + timedelta(minutes=1))
+
+    day_start, day_end = START - 2 * hour, START + 9 * hour
+    assert index.gaps(day_start, day_end) == [
+        (day_start, START), (START + 3 * hour, START + 5 * hour), (START + 6 * hour, day_end)]
+    assert index.gaps(day_start, day_end, min_length=2 * hour) == [
+        (day_start, START), (START + 3 * hour, START + 5 * hour), (START + 6 * hour, day_end)]
+    assert index.gaps(day_start, day_end, min_length=2 * hour + timedelta(minutes=1)) == [
+        (START + 6 * hour, day_end)]
+    # A window inside a booking has no gap; one ending where a booking
+    # starts is free up to it.
+    assert index.gaps(START + hour, START + 2 * hour) == []
+    assert index.gaps(START - hour, START) == [(START - hour, START)]
+    assert IntervalIndex().gaps(START, START + hour) == [(START, START + hour)]
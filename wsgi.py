@@ -0,0 +1,31 @@
+'''
+WSGI entry point for multi-worker servers, e.g.
+
+    FYYUR_ENV=prod SECRET_KEY=... DATABASE_URL=postgresql://... \
+        gunicorn --workers 4 --preload wsgi:app
+
+Each worker gets its own connection pool (sized by DB_POOL_SIZE and
+DB_MAX_OVERFLOW in config.py), while the response cache is shared through
+redis (CACHE_REDIS_URL). Connections opened in the master before forking,
+as happens with --preload, are dropped in every child, for the primary and
+every replica engine, instead of being shared across processes.
+'''
+import os
+
+from fyyur import create_app
+from fyyur.extensions import db
+
+app = create_app()
+
+with app.app_context():
+    # The primary and the read replica binds.
+    engines = list(db.engines.values())
+
+
+def dispose_engines():
+    for engine in engines:
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=dispose_engines)